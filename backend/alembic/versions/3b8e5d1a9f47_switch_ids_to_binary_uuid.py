@@ -0,0 +1,238 @@
+"""Switch the UUID id columns to BINARY(16)
+
+Revision ID: 3b8e5d1a9f47
+Revises: f1c7b9e24d06
+Create Date: 2026-10-17 22:18:06.742913
+
+Second step of the move to binary UUIDv7 ids. On MySQL 8 it runs in three
+phases:
+
+1. drop every foreign key on an id column, so nothing references a column
+   while it is replaced;
+2. per table, one ALTER replacing the text columns by the ``<column>_bin``
+   twins filled by f1c7b9e24d06 and rebuilding the primary key and the
+   indexes on them (an in-place rebuild that allows concurrent reads);
+3. re-add the foreign keys on the binary columns.
+
+Run it together with the deploy of the code using app.db.types.UUIDBinary:
+once a table is swapped, writes from the previous release to it fail.
+
+Other databases (SQLite dev databases) have no twins; their ids are
+rewritten in place and the columns retyped with batch_alter_table, which
+copies each table.
+
+Existing uuid4 ids keep their value (and tokens issued for them stay
+valid); new ids are UUIDv7. The downgrade is lossless: the binary ids are
+the UUID_TO_BIN bytes of the text ids (no swap flag), so BIN_TO_UUID gives
+back the original strings, and on MySQL the twins and their triggers are
+restored as f1c7b9e24d06 left them.
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e5d1a9f47'
+down_revision: Union[str, Sequence[str], None] = 'f1c7b9e24d06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# Id columns per table with their VARCHAR length before this revision
+ID_COLUMNS = {
+    'user': {'id': 36},
+    'profiles': {'id': 36, 'user_id': 36},
+    'jobs': {'id': 100, 'user_id': 100},
+    'client_job_stats': {'user_id': 100},
+    'profile_skills': {'profile_id': 36},
+    'job_search_terms': {'job_id': 100},
+}
+
+
+def _is_id_column(table: str, columns) -> bool:
+    return bool(set(ID_COLUMNS.get(table, ())) & set(columns))
+
+
+def _names(columns) -> str:
+    return ', '.join(f'`{column}`' for column in columns)
+
+
+def _drop_foreign_keys(inspector) -> list:
+    """Drop every foreign key from or to an id column, whatever table it is
+    on; returns them for re-creation."""
+    dropped = []
+    for table in inspector.get_table_names():
+        for fk in inspector.get_foreign_keys(table):
+            if _is_id_column(table, fk['constrained_columns']) or _is_id_column(
+                fk['referred_table'], fk['referred_columns']
+            ):
+                op.drop_constraint(fk['name'], table, type_='foreignkey')
+                dropped.append((table, fk))
+    return dropped
+
+
+def _create_foreign_keys(dropped: list):
+    # every row was checked under the old keys; without the check MySQL adds
+    # the constraints in place instead of copying the table
+    op.execute('SET foreign_key_checks = 0')
+    for table, fk in dropped:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns'],
+            ondelete=fk['options'].get('ondelete'),
+        )
+    op.execute('SET foreign_key_checks = 1')
+
+
+def _swap(inspector, table: str, types: dict, source: str, keep_binary: bool = False):
+    """Replace each id column by its ``<column><source>`` twin, as
+    ``types[column]``, in one ALTER that also rebuilds the primary key and the
+    indexes covering those columns. The replaced column is dropped, or with
+    ``keep_binary`` kept as the ``<column>_bin`` twin. Foreign keys on the
+    columns must have been dropped first."""
+    columns = set(types)
+    pk = inspector.get_pk_constraint(table)['constrained_columns']
+    indexes = [
+        index for index in inspector.get_indexes(table)
+        if columns & set(index['column_names'])
+    ]
+    clauses = []
+    if columns & set(pk):
+        clauses.append('DROP PRIMARY KEY')
+    clauses += [f"DROP INDEX `{index['name']}`" for index in indexes]
+    for column, type_ in types.items():
+        if keep_binary:
+            clauses.append(f'CHANGE `{column}` `{column}_bin` BINARY(16) NULL')
+        else:
+            clauses.append(f'DROP COLUMN `{column}`')
+        clauses.append(f'CHANGE `{column}{source}` `{column}` {type_} NOT NULL')
+    if columns & set(pk):
+        clauses.append(f'ADD PRIMARY KEY ({_names(pk)})')
+    clauses += [
+        f"ADD {'UNIQUE ' if index['unique'] else ''}INDEX `{index['name']}` ({_names(index['column_names'])})"
+        for index in indexes
+    ]
+    op.execute(f'ALTER TABLE `{table}` ' + ', '.join(clauses))
+
+
+def _rewrite_ids(table: str, columns: dict, convert, new_type):
+    """Portable path: rewrite each distinct id of ``columns`` with ``convert``,
+    then retype the columns. Meant for small development databases."""
+    bind = op.get_bind()
+    rows = sa.table(table, *(sa.column(column) for column in columns))
+    for column in columns:
+        values = bind.execute(
+            sa.select(rows.c[column]).distinct().where(rows.c[column].isnot(None))
+        ).scalars().all()
+        update = (
+            rows.update()
+            .where(rows.c[column] == sa.bindparam('old_value'))
+            .values({column: sa.bindparam('new_value')})
+        )
+        for start in range(0, len(values), BATCH_SIZE):
+            bind.execute(update, [
+                {'old_value': value, 'new_value': convert(value)}
+                for value in values[start:start + BATCH_SIZE]
+            ])
+    # Reflected with the new types, so the table copy takes the rewritten
+    # values as they are: an ALTER of the type would CAST them, and on SQLite
+    # a CAST to BINARY(16) turns every id into the number 0.
+    # (a column given in reflect_args loses its reflected foreign key, so
+    # the keys are passed along with it)
+    inspector = sa.inspect(bind)
+    pk = inspector.get_pk_constraint(table)['constrained_columns']
+    foreign_keys = {
+        fk['constrained_columns'][0]: sa.ForeignKey(
+            f"{fk['referred_table']}.{fk['referred_columns'][0]}",
+            name=fk['name'], ondelete=fk['options'].get('ondelete'),
+        )
+        for fk in inspector.get_foreign_keys(table)
+        if fk['constrained_columns'][0] in columns
+    }
+    with op.batch_alter_table(
+        table,
+        recreate='always',
+        reflect_args=[
+            sa.Column(
+                column, new_type(length),
+                *([foreign_keys[column]] if column in foreign_keys else []),
+                nullable=False, primary_key=column in pk,
+            )
+            for column, length in columns.items()
+        ],
+    ):
+        pass
+
+
+def _to_binary(value) -> bytes:
+    return uuid.UUID(value).bytes
+
+
+def _to_text(value) -> str:
+    return str(uuid.UUID(bytes=bytes(value)))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        for table, columns in ID_COLUMNS.items():
+            _rewrite_ids(table, columns, _to_binary, lambda length: sa.BINARY(16))
+        return
+
+    for table, columns in ID_COLUMNS.items():
+        for column in columns:
+            missing = bind.execute(
+                sa.text(f'SELECT 1 FROM `{table}` WHERE `{column}_bin` IS NULL LIMIT 1')
+            ).first()
+            if missing:
+                raise RuntimeError(f'{table}.{column}_bin is not backfilled; rerun f1c7b9e24d06')
+
+    inspector = sa.inspect(bind)
+    # 1. nothing may reference a column while it is replaced
+    dropped = _drop_foreign_keys(inspector)
+    # 2. swap the columns, primary keys and indexes table by table
+    for table, columns in ID_COLUMNS.items():
+        for event in ('insert', 'update'):
+            op.execute(f'DROP TRIGGER IF EXISTS `{table}_{event}_bin_ids`')
+        _swap(inspector, table, {column: 'BINARY(16)' for column in columns}, '_bin')
+    # 3. the same foreign keys, now on the binary columns
+    _create_foreign_keys(dropped)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        for table, columns in ID_COLUMNS.items():
+            _rewrite_ids(table, columns, _to_text, sa.String)
+        return
+
+    inspector = sa.inspect(bind)
+    dropped = _drop_foreign_keys(inspector)
+    for table, columns in ID_COLUMNS.items():
+        op.execute(
+            f'ALTER TABLE `{table}` '
+            + ', '.join(f'ADD COLUMN `{column}_text` VARCHAR({length}) NULL' for column, length in columns.items())
+        )
+        op.execute(
+            f'UPDATE `{table}` SET '
+            + ', '.join(f'`{column}_text` = BIN_TO_UUID(`{column}`)' for column in columns)
+        )
+        _swap(
+            inspector, table,
+            {column: f'VARCHAR({length})' for column, length in columns.items()},
+            '_text', keep_binary=True,
+        )
+        # back to the state f1c7b9e24d06 left: twins kept in step by triggers
+        sets = ', '.join(f'NEW.`{column}_bin` = UUID_TO_BIN(NEW.`{column}`)' for column in columns)
+        for event in ('INSERT', 'UPDATE'):
+            op.execute(
+                f'CREATE TRIGGER `{table}_{event.lower()}_bin_ids` BEFORE {event} ON `{table}` '
+                f'FOR EACH ROW SET {sets}'
+            )
+    _create_foreign_keys(dropped)
@@ -0,0 +1,38 @@
+"""Add job_search_terms inverted index
+
+Revision ID: 3f9a2c71d4b8
+Revises: 82491d3fdcd2
+Create Date: 2026-10-17 10:12:44.318201
+
+Existing jobs are indexed with ``python -m app.commands.search_index rebuild``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a2c71d4b8'
+down_revision: Union[str, Sequence[str], None] = '82491d3fdcd2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_search_terms',
+    sa.Column('term', sa.String(length=64), nullable=False),
+    sa.Column('field', sa.String(length=16), nullable=False),
+    sa.Column('job_id', sa.String(length=100), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('term', 'field', 'job_id')
+    )
+    op.create_index('ix_job_search_terms_job_id', 'job_search_terms', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_search_terms_job_id', table_name='job_search_terms')
+    op.drop_table('job_search_terms')
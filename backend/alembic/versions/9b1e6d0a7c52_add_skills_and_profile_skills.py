@@ -0,0 +1,76 @@
+"""Add skills and profile_skills, backfilled from profiles.skills
+
+Revision ID: 9b1e6d0a7c52
+Revises: 3f9a2c71d4b8
+Create Date: 2026-10-17 11:03:27.550914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1e6d0a7c52'
+down_revision: Union[str, Sequence[str], None] = '3f9a2c71d4b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    skills = op.create_table('skills',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    profile_skills = op.create_table('profile_skills',
+    sa.Column('profile_id', sa.String(length=36), nullable=False),
+    sa.Column('skill_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('profile_id', 'skill_id')
+    )
+    op.create_index('ix_profile_skills_skill_id_profile_id', 'profile_skills', ['skill_id', 'profile_id'], unique=False)
+
+    # Backfill from the comma-joined strings, same normalization as the app
+    bind = op.get_bind()
+    profiles = sa.table('profiles', sa.column('id'), sa.column('skills'))
+    skill_ids = {}
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(profiles.c.id, profiles.c.skills)
+            .where(profiles.c.id > last_id)
+            .order_by(profiles.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        links = []
+        for profile_id, raw in rows:
+            names = []
+            for name in (raw or '').split(','):
+                name = name.strip().lower()[:100]
+                if name and name not in names:
+                    names.append(name)
+            for name in names:
+                if name not in skill_ids:
+                    skill_ids[name] = bind.execute(
+                        sa.insert(skills).values(name=name)
+                    ).inserted_primary_key[0]
+                links.append({'profile_id': profile_id, 'skill_id': skill_ids[name]})
+        if links:
+            bind.execute(sa.insert(profile_skills), links)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_profile_skills_skill_id_profile_id', table_name='profile_skills')
+    op.drop_table('profile_skills')
+    op.drop_table('skills')
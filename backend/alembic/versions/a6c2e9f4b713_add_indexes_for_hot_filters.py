@@ -0,0 +1,45 @@
+"""Add composite indexes for the dashboard, search and admin filters
+
+Revision ID: a6c2e9f4b713
+Revises: e7a35b90c1f4
+Create Date: 2026-10-17 15:02:38.419087
+
+Check new query shapes with ``python -m app.commands.index_advisor``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2e9f4b713'
+down_revision: Union[str, Sequence[str], None] = 'e7a35b90c1f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_jobs_user_id_created_at', 'jobs', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_jobs_user_id_status_created_at', 'jobs', ['user_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_jobs_created_at', 'jobs', ['created_at'], unique=False)
+    op.create_index('ix_jobs_is_active_created_at', 'jobs', ['is_active', 'created_at'], unique=False)
+    op.create_index('ix_jobs_is_active_budget', 'jobs', ['is_active', 'budget'], unique=False)
+    op.create_index('ix_user_created_at', 'user', ['created_at'], unique=False)
+    op.create_index('ix_user_role_name', 'user', ['role', 'name'], unique=False)
+    op.create_index('ix_profiles_hourly_rate', 'profiles', ['hourly_rate'], unique=False)
+    op.create_index('ix_profiles_available_hourly_rate', 'profiles', ['available', 'hourly_rate'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_profiles_available_hourly_rate', table_name='profiles')
+    op.drop_index('ix_profiles_hourly_rate', table_name='profiles')
+    op.drop_index('ix_user_role_name', table_name='user')
+    op.drop_index('ix_user_created_at', table_name='user')
+    op.drop_index('ix_jobs_is_active_budget', table_name='jobs')
+    op.drop_index('ix_jobs_is_active_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_user_id_status_created_at', table_name='jobs')
+    op.drop_index('ix_jobs_user_id_created_at', table_name='jobs')
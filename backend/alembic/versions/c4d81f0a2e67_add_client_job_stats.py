@@ -0,0 +1,45 @@
+"""Add client_job_stats, backfilled from jobs
+
+Revision ID: c4d81f0a2e67
+Revises: 9b1e6d0a7c52
+Create Date: 2026-10-17 12:41:09.207316
+
+Later drift can be checked with ``python -m app.commands.job_stats verify``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d81f0a2e67'
+down_revision: Union[str, Sequence[str], None] = '9b1e6d0a7c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('client_job_stats',
+    sa.Column('user_id', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('work_mode', sa.String(length=50), nullable=False),
+    sa.Column('job_count', sa.Integer(), nullable=False),
+    sa.Column('active_count', sa.Integer(), nullable=False),
+    sa.Column('total_budget', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'status', 'work_mode')
+    )
+    op.execute(
+        "INSERT INTO client_job_stats "
+        "(user_id, status, work_mode, job_count, active_count, total_budget) "
+        "SELECT user_id, COALESCE(status, ''), COALESCE(work_mode, ''), COUNT(id), "
+        "SUM(CASE WHEN is_active = 0 THEN 0 ELSE 1 END), COALESCE(SUM(budget), 0) "
+        "FROM jobs GROUP BY user_id, COALESCE(status, ''), COALESCE(work_mode, '')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('client_job_stats')
@@ -0,0 +1,52 @@
+"""Add signup and job rollup tables for the admin dashboard
+
+Revision ID: e7a35b90c1f4
+Revises: c4d81f0a2e67
+Create Date: 2026-10-17 14:20:53.871440
+
+The history is aggregated by the first ``python -m app.commands.rollups run``
+(or by the in-process scheduler).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a35b90c1f4'
+down_revision: Union[str, Sequence[str], None] = 'c4d81f0a2e67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('signup_rollups',
+    sa.Column('period', sa.String(length=8), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('role', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('period', 'bucket', 'role')
+    )
+    op.create_table('job_rollups',
+    sa.Column('period', sa.String(length=8), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('job_type', sa.String(length=50), nullable=False),
+    sa.Column('work_mode', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('period', 'bucket', 'category', 'job_type', 'work_mode')
+    )
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('position', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rollup_watermarks')
+    op.drop_table('job_rollups')
+    op.drop_table('signup_rollups')
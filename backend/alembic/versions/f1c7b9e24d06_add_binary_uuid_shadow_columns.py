@@ -0,0 +1,110 @@
+"""Add BINARY(16) twins of the UUID id columns, filled by triggers and backfill
+
+Revision ID: f1c7b9e24d06
+Revises: a6c2e9f4b713
+Create Date: 2026-10-17 22:04:51.318204
+
+First of two steps moving the ids to binary UUIDv7 (app/db/types.py). This
+one is safe under live traffic from the current release: every id column
+gets a nullable ``<column>_bin`` twin, triggers keep it in step with inserts
+and updates, and existing rows are converted in short autocommitted batches
+walking each key's index. Revision 3b8e5d1a9f47 then swaps the columns.
+
+Written for MySQL 8 (UUID_TO_BIN). The twins only exist to make the move
+online; on other databases (SQLite dev databases) this revision does
+nothing and 3b8e5d1a9f47 converts the ids in place.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7b9e24d06'
+down_revision: Union[str, Sequence[str], None] = 'a6c2e9f4b713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# Columns holding ids, grouped by the table the ids belong to
+ID_COLUMNS = {
+    'user': [('user', 'id'), ('profiles', 'user_id'), ('jobs', 'user_id'), ('client_job_stats', 'user_id')],
+    'profiles': [('profiles', 'id'), ('profile_skills', 'profile_id')],
+    'jobs': [('jobs', 'id'), ('job_search_terms', 'job_id')],
+}
+
+
+def _columns_by_table() -> dict:
+    tables = {}
+    for columns in ID_COLUMNS.values():
+        for table, column in columns:
+            tables.setdefault(table, []).append(column)
+    return tables
+
+
+def _is_mysql() -> bool:
+    return op.get_bind().dialect.name == 'mysql'
+
+
+def create_triggers(table: str, columns: list):
+    sets = ', '.join(f'NEW.`{column}_bin` = UUID_TO_BIN(NEW.`{column}`)' for column in columns)
+    for event in ('INSERT', 'UPDATE'):
+        op.execute(
+            f'CREATE TRIGGER `{table}_{event.lower()}_bin_ids` BEFORE {event} ON `{table}` '
+            f'FOR EACH ROW SET {sets}'
+        )
+
+
+def drop_triggers(table: str):
+    for event in ('insert', 'update'):
+        op.execute(f'DROP TRIGGER IF EXISTS `{table}_{event}_bin_ids`')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _is_mysql():
+        return
+    for table, columns in _columns_by_table().items():
+        op.execute(
+            f'ALTER TABLE `{table}` '
+            + ', '.join(f'ADD COLUMN `{column}_bin` BINARY(16) NULL' for column in columns)
+        )
+        create_triggers(table, columns)
+
+    # Rows written from here on are converted by the triggers. Walk the ids
+    # of each owning table and convert every column holding them by range,
+    # committing each batch so no lock is held for long.
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for owner, columns in ID_COLUMNS.items():
+            last_id = ''
+            while True:
+                ids = bind.execute(
+                    sa.text(f'SELECT id FROM `{owner}` WHERE id > :last_id ORDER BY id LIMIT {BATCH_SIZE}'),
+                    {'last_id': last_id},
+                ).scalars().all()
+                if not ids:
+                    break
+                for table, column in columns:
+                    bind.execute(
+                        sa.text(
+                            f'UPDATE `{table}` SET `{column}_bin` = UUID_TO_BIN(`{column}`) '
+                            f'WHERE `{column}` BETWEEN :first AND :last'
+                        ),
+                        {'first': ids[0], 'last': ids[-1]},
+                    )
+                last_id = ids[-1]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_mysql():
+        return
+    for table, columns in _columns_by_table().items():
+        drop_triggers(table)
+        op.execute(
+            f'ALTER TABLE `{table}` '
+            + ', '.join(f'DROP COLUMN `{column}_bin`' for column in columns)
+        )
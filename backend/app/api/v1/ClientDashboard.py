@@ -1,29 +1,60 @@
-import json
 from typing import Optional
 from fastapi import (
     APIRouter,
     HTTPException,
     Query,
-    Request,
-    dependencies,
     Depends,
     status,
 )
 from ...models.job import Job
 from ...models.user import User
-from sqlalchemy.orm import Session
-from .auth import get_db, get_current_user
-from sqlalchemy import func
+from ...core.security import Principal
+from ...models.stats import ClientJobStat
+from ...models.rollup import JobRollup, RollupWatermark, SignupRollup
+from sqlalchemy.ext.asyncio import AsyncSession
+from .auth import AUTH_RESPONSES, get_async_db, get_current_user, admin_require
+from ...db.dependencies.get_db import get_session
+from sqlalchemy import func, select
 from datetime import datetime, timedelta
-from ...middleware.redis import make_cache_key, redis
+from ...middleware.cache import CacheEntry, ResponseCache, cache_stats
+from ...utils.search import match_jobs, tokenize
+from ...utils.rollups import ROLLUPS_TAG, rollup_filter
+from ...utils.projection import Projection
+from ...utils.pagination import (
+    TOTALS_MODES,
+    count_total,
+    order_clauses,
+    paginate_keyset,
+    paginate_offset,
+)
 
 router = APIRouter()
 
+# Columns each listing outputs, read as plain rows
+CLIENT_JOB_FIELDS = Projection(
+    Job,
+    "title",
+    "created_at",
+    "status",
+    "updated_at",
+    "job_description",
+    "budget",
+    "deadline",
+    "work_mode",
+    "category",
+    "location",
+    "job_type",
+    "visibility",
+    "payment_status",
+)
+NEW_USER_FIELDS = Projection(User, "name", "email")
+NEW_JOB_FIELDS = Projection(Job, "title", "job_description")
+
 
-@router.get("/job/Panel")
-def client_dashboard(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+@router.get("/job/Panel", responses=AUTH_RESPONSES)
+async def client_dashboard(
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of jobs per page"),
     status: Optional[str] = Query(
@@ -38,89 +69,123 @@ def client_dashboard(
         "created_at", description="Sort by field (created_at, budget, deadline)"
     ),
     sort_order: str = Query("desc", description="Sort order (asc, desc)"),
+    cursor: Optional[str] = Query(
+        None, description="Keyset cursor; replaces page when given"
+    ),
+    pagination: str = Query(
+        "offset", enum=["offset", "keyset"], description="Pagination mode"
+    ),
+    totals: str = Query(
+        "exact",
+        enum=TOTALS_MODES,
+        description="exact total, cached approximate total, or has_more only",
+    ),
+    cache: CacheEntry = Depends(
+        ResponseCache(ttl=120, vary=("query", "user"), tags=["jobs:user:{user_id}"])
+    ),
 ):
-    db_user = db.query(User).filter(User.id == user.id).first()
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
+    cached = await cache.get()
+    if cached is not None:
+        return cached
 
-    query = db.query(Job).filter(Job.user_id == user.id)
+    query = CLIENT_JOB_FIELDS.select().where(Job.user_id == user.id)
 
     if status:
-        query = query.filter(Job.status == status)
+        query = query.where(Job.status == status)
     if work_mode:
-        query = query.filter(Job.work_mode == work_mode)
+        query = query.where(Job.work_mode == work_mode)
     if category:
-        query = query.filter(Job.category == category)
-    if search:
-        query = query.filter(
-            (Job.title.ilike(f"%{search}%"))
-            | (Job.job_description.ilike(f"%{search}%"))
-        )
+        query = query.where(Job.category == category)
+    search_terms = tokenize(search)
+    if search_terms:
+        matched = match_jobs(search_terms, fields=["title", "description"])
+        query = query.join(matched, matched.c.job_id == Job.id)
 
-    sort_field = {
+    sort_fields = {
         "created_at": Job.created_at,
         "budget": Job.budget,
         "deadline": Job.deadline,
-    }.get(sort_by, Job.created_at)
-    query = query.order_by(
-        sort_field.desc() if sort_order.lower() == "desc" else sort_field.asc()
-    )
+    }
+    if sort_by not in sort_fields:
+        sort_by = "created_at"
+    descending = sort_order.lower() == "desc"
+    sort_keys = [
+        (sort_by, sort_fields[sort_by], descending),
+        ("id", Job.id, descending),
+    ]
 
-    total_jobs = query.count()
-    jobs = query.offset((page - 1) * page_size).limit(page_size).all()
+    if cursor or pagination == "keyset":
+        job_page = await paginate_keyset(db, query, sort_keys, page_size, cursor)
+        job_page.update(await count_total(db, query, totals))
+        job_page["has_more"] = job_page["next_cursor"] is not None
+    else:
+        job_page = await paginate_offset(
+            db, query, sort_keys, page_size, (page - 1) * page_size, totals
+        )
+    jobs = job_page.pop("items")
+    total_jobs = job_page.pop("total")
 
-    if not jobs and page == 1:
+    if not jobs and page == 1 and not cursor:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="This user does not have any jobs matching the criteria",
         )
 
     try:
-        # Calculate total budget
-        total_budget = (
-            db.query(func.sum(Job.budget)).filter(Job.user_id == user.id).scalar()
-            or 0.0
-        )
-
-        # Calculate job statistics
-        stats_query = (
-            db.query(Job.status, Job.work_mode, func.count(Job.id))
-            .filter(Job.user_id == user.id)
-            .group_by(Job.status, Job.work_mode)
-            .all()
-        )
+        # Totals come from client_job_stats (kept by app/crud/job.py),
+        # a single primary key range read whatever the number of jobs
+        stat_rows = (
+            await db.scalars(
+                select(ClientJobStat).where(
+                    ClientJobStat.user_id == user.id, ClientJobStat.job_count > 0
+                )
+            )
+        ).all()
+        total_budget = sum(row.total_budget for row in stat_rows)
         job_stats = [
-            {"status": s, "work_mode": wm, "count": c} for s, wm, c in stats_query
+            {
+                "status": row.status or None,
+                "work_mode": row.work_mode or None,
+                "count": row.job_count,
+            }
+            for row in stat_rows
         ]
 
         # Prepare response
         response_data = {
             "total_budget": total_budget,
+            "active_jobs": sum(row.active_count for row in stat_rows),
+            "closed_jobs": sum(
+                row.job_count for row in stat_rows if row.status == "closed"
+            ),
             "total_jobs": total_jobs,
             "page": page,
             "page_size": page_size,
+            **job_page,
             "job_stats": job_stats,
             "jobs": [
                 {
-                    "project_title": job.title,
-                    "start_day": job.created_at.isoformat(),
-                    "current_status": job.status,  # Use actual status field
-                    "last_update": job.updated_at.isoformat(),
-                    "job_description": job.job_description,
-                    "budget": job.budget,
-                    "deadline": job.deadline.isoformat() if job.deadline else None,
-                    "work_mode": job.work_mode,
-                    "category": job.category,
-                    "location": job.location,
-                    "job_type": job.job_type,
-                    "visibility": job.visibility,
-                    "payment_status": job.payment_status,
+                    "project_title": job["title"],
+                    "start_day": job["created_at"].isoformat(),
+                    "current_status": job["status"],  # Use actual status field
+                    "last_update": job["updated_at"].isoformat(),
+                    "job_description": job["job_description"],
+                    "budget": job["budget"],
+                    "deadline": (
+                        job["deadline"].isoformat() if job["deadline"] else None
+                    ),
+                    "work_mode": job["work_mode"],
+                    "category": job["category"],
+                    "location": job["location"],
+                    "job_type": job["job_type"],
+                    "visibility": job["visibility"],
+                    "payment_status": job["payment_status"],
                 }
                 for job in jobs
             ],
         }
 
-        return response_data
+        return await cache.set(response_data)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -129,60 +194,105 @@ def client_dashboard(
 
 
 @router.get("/Admin/Dashboard")
-def admin_dashboard(
-    requset: Request,
-    db: Session = Depends(get_db),
+async def admin_dashboard(
+    db: AsyncSession = Depends(get_session(read_only=True)),
     limit: int = Query(ge=5, le=20, default=5),
     offset: int = Query(ge=0, le=10, default=0),
     category: Optional[str] = Query(default=None),
     start_date: datetime = Query(default=None),
+    end_date: Optional[datetime] = Query(default=None),
+    pagination: str = Query(
+        "offset", enum=["offset", "keyset"], description="Pagination mode"
+    ),
+    users_cursor: Optional[str] = Query(default=None),
+    jobs_cursor: Optional[str] = Query(default=None),
+    cache: CacheEntry = Depends(
+        ResponseCache(ttl=300, tags=["users", "jobs", ROLLUPS_TAG])
+    ),
 ):
-    now = datetime.now()
+    """Admin overview. ``total_users_by_role`` counts the current users;
+    ``signups_by_role`` and the category counts come from the rollup tables
+    (app/utils/rollups.py) for ``[start_date, end_date)``, all time by default.
+    """
+    now = datetime.utcnow()
     week_ago = now - timedelta(days=7)
 
-    cache_reponse = make_cache_key(str(requset.url.path), dict(requset.query_params))
-    cached = redis.get(cache_reponse)
-    if cached:
-        return {"from redis": json.loads(cached)}
+    cached = await cache.get()
+    if cached is not None:
+        return cached
 
-    #  Total users grouped by role
+    #  Total users grouped by role, one pass over ix_user_role_name
     total_users_by_role = (
-        db.query(User.role, func.count(User.id).label("count"))
-        .group_by(User.role)
-        .all()
-    )
+        await db.execute(
+            select(User.role, func.count().label("count")).group_by(User.role)
+        )
+    ).all()
+
+    #  Users signed up in the range, grouped by the role they signed up with
+    signups_by_role = (
+        await db.execute(
+            select(SignupRollup.role, func.sum(SignupRollup.count).label("count"))
+            .where(*rollup_filter(SignupRollup, start_date, end_date))
+            .group_by(SignupRollup.role)
+        )
+    ).all()
+
+    keyset = pagination == "keyset"
+    cursors = {}
 
     #  New users in the last 7 days
-    new_users = (
-        db.query(User)
-        .filter(User.created_at >= week_ago)
-        .order_by(User.created_at.desc())
-        .limit(limit)
-        .offset(offset)
-        .all()
-    )
+    new_users_query = NEW_USER_FIELDS.select().where(User.created_at >= week_ago)
+    user_keys = [("created_at", User.created_at, True), ("id", User.id, True)]
+    if keyset or users_cursor:
+        users_page = await paginate_keyset(
+            db, new_users_query, user_keys, limit, users_cursor
+        )
+        new_users = users_page["items"]
+        cursors["new_users_next_cursor"] = users_page["next_cursor"]
+        cursors["new_users_prev_cursor"] = users_page["prev_cursor"]
+    else:
+        new_users = (
+            await db.execute(
+                new_users_query.order_by(*order_clauses(user_keys))
+                .limit(limit)
+                .offset(offset)
+            )
+        ).mappings()
 
     #  New jobs posted in the last 7 days
-    new_jobs = (
-        db.query(Job)
-        .filter(Job.created_at >= week_ago)
-        .order_by(Job.created_at.desc())
-        .limit(limit)
-        .offset(offset)
-        .all()
-    )
+    new_jobs_query = NEW_JOB_FIELDS.select().where(Job.created_at >= week_ago)
+    job_keys = [("created_at", Job.created_at, True), ("id", Job.id, True)]
+    if keyset or jobs_cursor:
+        jobs_page = await paginate_keyset(
+            db, new_jobs_query, job_keys, limit, jobs_cursor
+        )
+        new_jobs = jobs_page["items"]
+        cursors["new_jobs_next_cursor"] = jobs_page["next_cursor"]
+        cursors["new_jobs_prev_cursor"] = jobs_page["prev_cursor"]
+    else:
+        new_jobs = (
+            await db.execute(
+                new_jobs_query.order_by(*order_clauses(job_keys))
+                .limit(limit)
+                .offset(offset)
+            )
+        ).mappings()
 
     #  Job category counts (optional filter)
+    job_count = func.sum(JobRollup.count)
     job_category_query = (
-        db.query(Job.category, func.count(Job.id).label("count"))
-        .group_by(Job.category)
-        .order_by(func.count(Job.id).desc())
+        select(JobRollup.category, job_count.label("count"))
+        .where(*rollup_filter(JobRollup, start_date, end_date))
+        .group_by(JobRollup.category)
+        .order_by(job_count.desc(), JobRollup.category)
     )
 
     if category:
-        job_category_query = job_category_query.filter(Job.category == category)
+        job_category_query = job_category_query.where(JobRollup.category == category)
 
-    job_categories = job_category_query.limit(limit).offset(offset).all()
+    job_categories = (
+        await db.execute(job_category_query.limit(limit).offset(offset))
+    ).all()
 
     # Structured response
 
@@ -190,13 +300,27 @@ def admin_dashboard(
         "total_users_by_role": [
             {"role": role, "count": count} for role, count in total_users_by_role
         ],
-        "new_users": [{"name": user.name, "email": user.email} for user in new_users],
+        "signups_by_role": [
+            {"role": role, "count": count} for role, count in signups_by_role
+        ],
+        "new_users": [
+            {"name": user["name"], "email": user["email"]} for user in new_users
+        ],
         "new_jobs": [
-            {"title": job.title, "description": job.job_description} for job in new_jobs
+            {"title": job["title"], "description": job["job_description"]}
+            for job in new_jobs
         ],
         "job_category_counts": [
-            {"category": category, "count": count} for category, count in job_categories
+            {"category": category or None, "count": count}
+            for category, count in job_categories
         ],
+        "rollups_through": await db.scalar(select(func.min(RollupWatermark.position))),
+        **cursors,
     }
-    redis.setex(cache_reponse, 60, json.dumps(response))
-    return response
+    return await cache.set(response)
+
+
+@router.get("/Admin/cache-stats", responses=AUTH_RESPONSES)
+async def admin_cache_stats(user: Principal = Depends(admin_require)):
+    """Hit/miss/eviction counters of this worker's response cache."""
+    return cache_stats()
@@ -1,32 +1,26 @@
 from jose import jwt, JWTError
 from datetime import timedelta, datetime
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import status, HTTPException, Depends
-from ...db.dependencies.get_db import get_db
+from ...config import settings
+from ...core.security import ALGORITHM, SECRET_KEY, Principal
+from ...db.dependencies.get_db import get_async_db
+from ...middleware.cache import CacheEntry
 from ...models.user import User
 
 
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
-
-
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def create_refresh_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
@@ -34,7 +28,32 @@ def create_refresh_token(data: dict):
 token = OAuth2PasswordBearer(tokenUrl="/login")
 
 
-def get_current_user(token: str = Depends(token), db: Session = Depends(get_db)):
+# Documented on every route that depends on get_current_user
+AUTH_RESPONSES = {
+    401: {"description": "Invalid token, or its user no longer exists"},
+    403: {"description": "Expired token, banned account or missing role"},
+}
+
+
+def principal_cache_entry(user_id: str) -> CacheEntry:
+    # versions are always checked against Redis so bans apply on every worker
+    return CacheEntry(
+        f"cache:principal:{user_id}",
+        settings.principal_cache_ttl,
+        [f"users:{user_id}"],
+        trust_local_versions=False,
+    )
+
+
+async def get_current_user(
+    token: str = Depends(token), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """The principal of the bearer token, from the cached user snapshot.
+
+    A token whose user no longer exists (or whose email changed) is refused
+    with 401, like any other invalid credential; a banned user gets 403 on
+    every authenticated route.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("email")
@@ -50,18 +69,41 @@ def get_current_user(token: str = Depends(token), db: Session = Depends(get_db))
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired token"
         )
 
-    user = db.query(User).filter(User.id == id, User.email == email).first()
+    user_not_found = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found from get current user",
+    )
 
-    if not user:
+    # The row snapshot is cached per user and dropped whenever the user is
+    # written (users:{id} tag), so most requests skip the user lookup. Only
+    # existing users are cached: a deleted or forged id is looked up again.
+    entry = principal_cache_entry(id)
+    try:
+        snapshot = await entry.get()
+        if snapshot is None:
+            result = await db.execute(select(User).where(User.id == id))
+            user = result.scalars().first()
+            if user is None:
+                raise user_not_found
+            snapshot = Principal.from_user(user).to_dict()
+            await entry.set(snapshot)
+    finally:
+        await entry.release()
+
+    # (empty snapshots are misses cached by earlier releases)
+    if not snapshot or snapshot["email"] != email:
+        raise user_not_found
+
+    user = Principal(**snapshot)
+    if user.is_banned:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found from get current user",
+            status_code=status.HTTP_403_FORBIDDEN, detail="This account is banned"
         )
 
     return user
 
 
-def admin_require(current_user: User = Depends(get_current_user)):
+async def admin_require(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
     return current_user
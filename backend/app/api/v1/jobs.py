@@ -1,34 +1,53 @@
 from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, Query, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.job import Job
-from ...models.user import User
-from app.schemas.job import CreateJob, UpdateJob
-from .auth import get_current_user, get_db
-from ...utils.crud import create_instance, get_instance_or_404, update_instance
+from ...core.security import Principal
+from app.schemas.job import CreateJob, JobResponse, JobSearchPage, UpdateJob
+from .auth import AUTH_RESPONSES, get_current_user, get_async_db
+from ...db.dependencies.get_db import get_session
+from ...utils.crud import (
+    create_instance_async,
+    delete_instance_async,
+    update_instance_async,
+)
 from ...utils.exceptions import raise_not_found, raise_sever_error
 from ...utils.users import ensure_client
-from sqlalchemy import asc, desc
-from ...middleware.redis import make_cache_key, redis
-from ...schemas.job import JobResponse
-import json, hashlib
+from ...utils.search import match_jobs, tokenize
+from ...crud import job as job_stats  # noqa: F401 (client_job_stats listener)
+from ...utils.pagination import (
+    TOTALS_MODES,
+    count_total,
+    paginate_keyset,
+    paginate_offset,
+)
+from ...middleware.cache import CacheEntry, ResponseCache, invalidate_tags
+from ...utils.job_import import IMPORT_FORMATS, import_format, import_jobs
+from ...utils.export import EXPORT_FORMATS, accepts_gzip, export_response
+from ...utils.projection import Projection
+from ...utils.facets import FACETS, check_buckets, facet_counts
+from ...middleware.redis import make_cache_key
+from ...config import settings
 
 router = APIRouter()
 
+# job listings are read as plain rows rather than ORM objects
+JOB_FIELDS = Projection(Job, *(column.key for column in Job.__table__.columns))
+
 
-@router.post("/job", status_code=status.HTTP_201_CREATED)
-def post_job(
+@router.post("/job", status_code=status.HTTP_201_CREATED, responses=AUTH_RESPONSES)
+async def post_job(
     job: CreateJob,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     raise_not_found(user, "")
     ensure_client(user)
 
     try:
-        new_job = create_instance(db, Job, user_id=user.id, **job.dict())
+        new_job = await create_instance_async(db, Job, user_id=user.id, **job.dict())
 
         return {
             "message": "Job posted successfully",
@@ -42,95 +61,204 @@ def post_job(
         }
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         detail = f"An error occurred while posting the job {e}"
         raise_sever_error(db, detail)
 
 
-@router.get("/jobs")
-def get_job(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+@router.post("/import", responses=AUTH_RESPONSES)
+async def bulk_import_jobs(
+    request: Request,
+    format: Optional[str] = Query(
+        None,
+        enum=IMPORT_FORMATS,
+        description="Body format; taken from the Content-Type when omitted",
+    ),
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    jobs = db.query(Job).filter(Job.user_id == user.id).all()
-    return jobs
+    """Create many jobs from a streamed NDJSON or CSV body (CSV with a header
+    row of ``CreateJob`` field names).
+
+    Rows failing validation are skipped and reported by line number; the
+    others are inserted in batches (app/utils/job_import.py).
+    """
+    ensure_client(user)
+    format = format or import_format(request.headers.get("content-type"))
+    if format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send NDJSON (application/x-ndjson) or CSV (text/csv)",
+        )
+
+    report = await import_jobs(db, user.id, request.stream(), format)
+    if report["imported"]:
+        await invalidate_tags("jobs", f"jobs:user:{user.id}")
+    return report
+
+
+@router.get("/jobs", response_model=List[JobResponse], responses=AUTH_RESPONSES)
+async def get_job(
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    result = await db.execute(JOB_FIELDS.select().where(Job.user_id == user.id))
+    return result.mappings().all()
+
+
+@router.get("/export", responses=AUTH_RESPONSES)
+async def export_jobs(
+    request: Request,
+    format: str = Query("ndjson", enum=EXPORT_FORMATS, description="Export format"),
+    user: Principal = Depends(get_current_user),
+):
+    """Stream all of the caller's jobs, oldest first (app/utils/export.py)."""
+    stmt = (
+        JOB_FIELDS.select()
+        .where(Job.user_id == user.id)
+        .order_by(Job.created_at, Job.id)
+    )
+    gzip = accepts_gzip(request.headers.get("accept-encoding"))
+    return export_response(stmt, format, "jobs", gzip=gzip)
 
 
 @router.put("/job/{job_id}")
-def update_job(
+async def update_job(
     job_id: UUID,
     job_data: UpdateJob,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    job = db.query(Job).filter(Job.id == str(job_id)).first()
+    job = await db.get(Job, str(job_id))
     if not job:
         raise_not_found(job)
-    updated_job = update_instance(db, job, job_data.dict())
+    updated_job = await update_instance_async(db, job, job_data.dict())
     return updated_job
 
 
 @router.delete("/job/{job_id}")
-def delete_job(job_id: UUID, db: Session = Depends(get_db)):
-    job = db.query(Job).filter(Job.id == str(job_id)).first()
+async def delete_job(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(Job, str(job_id))
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    db.delete(job)
-    db.commit()
+    await delete_instance_async(db, job)
     return {"message": "Job deleted successfully", "job_id": str(job_id)}
 
 
-@router.get(
-    "/search",
-)
-def search_jobs(
-    request: Request,
+async def search_facets(
+    db: AsyncSession,
+    query_set,
+    filters: dict,
+    facets: List[str],
+    budget_buckets: Optional[List[float]] = None,
+) -> dict:
+    """Facet counts of the filtered ``query_set``, cached per filter set
+    rather than per page and dropped with the other job caches."""
+    unknown = set(facets) - set(FACETS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown facets: {', '.join(sorted(unknown))}",
+        )
+    edges = check_buckets(budget_buckets or settings.search_budget_buckets)
+    facets = sorted(set(facets))
+    key = make_cache_key(
+        "/jobs/search#facets",
+        {"filters": filters, "facets": facets, "buckets": edges},
+    )
+    entry = CacheEntry(key, settings.search_facets_ttl, ["jobs"])
+    try:
+        counts = await entry.get()
+        if counts is None:
+            counts = await entry.set(await facet_counts(db, query_set, facets, edges))
+    finally:
+        await entry.release()
+    return counts
+
+
+@router.get("/search", response_model=JobSearchPage)
+async def search_jobs(
     query: Optional[str] = Query(
-        None, description="Search by job title or description"
+        None, description="Search by job title, description, category or location"
+    ),
+    match: str = Query(
+        "all", enum=["all", "any"], description="Require all or any query terms"
     ),
     skills: Optional[List[str]] = Query(None, description="Filter by skills"),
     location: Optional[str] = Query(None, description="Filter by location"),
     budget_min: Optional[float] = Query(None, ge=0, description="Minimum budget"),
     budget_max: Optional[float] = Query(None, ge=0, description="Maximum budget"),
     job_type: Optional[str] = Query(None, description="Filter by job type"),
-    order_by: Optional[str] = Query("created_at", description="Order by field"),
+    order_by: Optional[str] = Query(
+        "created_at", description="Order by field (relevance needs a query)"
+    ),
     direction: Optional[str] = Query(
         "desc", enum=["asc", "desc"], description="Sort direction"
     ),
     limit: int = Query(10, ge=1, le=10, description="Number of jobs to return"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
-    db: Session = Depends(get_db),
+    pagination: str = Query(
+        "offset", enum=["offset", "keyset"], description="Pagination mode"
+    ),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a page"),
+    totals: str = Query(
+        "exact",
+        enum=TOTALS_MODES,
+        description="exact total, cached approximate total, or has_more only",
+    ),
+    facets: Optional[List[str]] = Query(
+        None, enum=FACETS, description="Facets to count over the filtered jobs"
+    ),
+    budget_buckets: Optional[List[float]] = Query(
+        None, description="Budget bucket edges (default settings.search_budget_buckets)"
+    ),
+    db: AsyncSession = Depends(get_session(read_only=True)),
+    cache: CacheEntry = Depends(ResponseCache(ttl=300, tags=["jobs"])),
 ):
-    """Search for jobs with flexible filtering and pagination."""
-    cache_key = make_cache_key(str(request.url.password), dict(request.query_params))
-    cached = redis.get(cache_key)
-    if cached:
-        return {"from redis": json.loads(cached)}
-    query_set = db.query(Job).filter(Job.is_active == True)
-
-    if query:
-        query = f"%{query.lower()}%"
-        query_set = query_set.filter(
-            (Job.title.ilike(query)) | (Job.job_description.ilike(query))
-        )
+    """Search for jobs with flexible filtering and pagination.
 
-    if skills:
-        for skill in skills:
-            skill = f"%{skill.lower()}%"
-            query_set = query_set.filter(Job.job_description.ilike(skill))
+    Keyset mode (``pagination=keyset`` or any ``cursor``) seeks past the
+    cursor instead of using ``offset`` and returns ``next_cursor`` and
+    ``prev_cursor``. ``totals`` picks how ``total`` is computed, exactly by
+    default; ``approximate`` totals may be a few minutes old, and
+    ``is_estimate`` is set when such a cached count was served.
 
+    ``facets`` adds counts per category, job type, work mode and budget
+    bucket over all the jobs matching the filters, not just the page. They
+    are cached per filter set, so paging or reordering reuses them.
+    """
+    cached = await cache.get()
+    if cached is not None:
+        return cached
+
+    query_set = JOB_FIELDS.select().where(Job.is_active == True)
+    score = None
+
+    # Text filters are term lookups on the inverted index (app/utils/search.py)
+    query_terms = tokenize(query)
+    if query_terms:
+        matched = match_jobs(query_terms, match_all=match == "all")
+        query_set = query_set.join(matched, matched.c.job_id == Job.id)
+        score = matched.c.score
+
+    skill_terms = tokenize(" ".join(skills or []))
+    if skill_terms:
+        matched = match_jobs(skill_terms, fields=["description"])
+        query_set = query_set.join(matched, matched.c.job_id == Job.id)
+
+    # substring match, so partial names ("Par") keep matching
     if location:
-        query_set = query_set.filter(Job.location.ilike(f"%{location.lower()}%"))
+        query_set = query_set.where(Job.location.ilike(f"%{location.lower()}%"))
 
     if budget_min is not None:
-        query_set = query_set.filter(Job.budget >= budget_min)
+        query_set = query_set.where(Job.budget >= budget_min)
 
     if budget_max is not None:
-        query_set = query_set.filter(Job.budget <= budget_max)
+        query_set = query_set.where(Job.budget <= budget_max)
 
     if job_type:
-        query_set = query_set.filter(Job.job_type == job_type)
+        query_set = query_set.where(Job.job_type == job_type)
 
     allowed_order_fields = {
         "title": Job.title,
@@ -138,23 +266,42 @@ def search_jobs(
         "created_at": Job.created_at,
         "location": Job.location,
     }
-    order_field = allowed_order_fields.get(order_by, Job.created_at)
-
-    query_set = query_set.order_by(
-        asc(order_field) if direction == "asc" else desc(order_field)
-    )
-
-    total = query_set.count()
+    if order_by == "relevance" and score is not None:
+        allowed_order_fields["relevance"] = score
+    if order_by not in allowed_order_fields:
+        order_by = "created_at"
+    descending = direction != "asc"
+    sort_keys = [
+        (order_by, allowed_order_fields[order_by], descending),
+        ("id", Job.id, descending),
+    ]
 
-    results = query_set.offset(offset).limit(limit).all()
+    if cursor or pagination == "keyset":
+        page = await paginate_keyset(db, query_set, sort_keys, limit, cursor)
+        page.update(await count_total(db, query_set, totals))
+        page["has_more"] = page["next_cursor"] is not None
+    else:
+        page = await paginate_offset(db, query_set, sort_keys, limit, offset, totals)
+    results = page.pop("items")
 
     response_data = {
-        "jobs": [JobResponse.from_orm(job).dict() for job in results],
-        "total": total,
+        "jobs": results,
         "offset": offset,
         "limit": limit,
+        **page,
     }
+    if facets:
+        filters = {
+            "query": query_terms,
+            "match": match,
+            "skills": skill_terms,
+            "location": location.lower() if location else None,
+            "budget_min": budget_min,
+            "budget_max": budget_max,
+            "job_type": job_type,
+        }
+        response_data["facets"] = await search_facets(
+            db, query_set, filters, facets, budget_buckets
+        )
 
-    redis.setex(cache_key, 60, json.dumps(response_data))
-
-    return {"jobs": results, "total": total, "offset": offset, "limit": limit}
+    return await cache.set(response_data)
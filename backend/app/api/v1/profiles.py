@@ -1,23 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from ...db.dependencies.get_db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...db.dependencies.get_db import get_async_db, get_session
 from ...schemas.profile import CreateProfile, UpdateProfile
-from .auth import get_current_user
+from .auth import AUTH_RESPONSES, admin_require, get_current_user
 from ...models.user import User
+from ...core.security import Principal
 from ...models.profile import Profile
+from ...crud.skill import match_profiles, normalize_skills
+from ...utils.pagination import (
+    TOTALS_MODES,
+    count_total,
+    paginate_keyset,
+    paginate_offset,
+)
+from ...middleware.cache import CacheEntry, ResponseCache
+from ...utils.projection import Projection
+from ...utils.export import EXPORT_FORMATS, accepts_gzip, export_response
 from ...utils.crud import (
-    create_instance,
-    get_instance_or_404,
-    update_instance,
-    delete_instance,
+    create_instance_async,
+    get_instance_or_404_async,
+    update_instance_async,
+    delete_instance_async,
 )
 from typing import Optional
 
 router = APIRouter()
 
+# what the freelancer search outputs; the user comes from the search's own join
+FREELANCER_FIELDS = Projection(
+    Profile,
+    "bio",
+    "skills",
+    "portfolio_links",
+    "location",
+    "hourly_rate",
+    "available",
+    user=Projection(User, "name", "email"),
+)
+
 
-def get_user_profile(user: User, db: Session) -> Profile:
-    profile = db.query(Profile).filter(Profile.user_id == user.id).first()
+async def get_user_profile(user: Principal, db: AsyncSession) -> Profile:
+    profile = await db.scalar(select(Profile).where(Profile.user_id == user.id))
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -26,13 +50,15 @@ def get_user_profile(user: User, db: Session) -> Profile:
     return profile
 
 
-@router.post("/profile")
-def create_profile(
+@router.post("/profile", responses=AUTH_RESPONSES)
+async def create_profile(
     profile: CreateProfile,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user),
 ):
-    existing_profile = db.query(Profile).filter(Profile.user_id == user.id).first()
+    existing_profile = await db.scalar(
+        select(Profile).where(Profile.user_id == user.id)
+    )
     if existing_profile:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,7 +68,7 @@ def create_profile(
     try:
         skills_str = ",".join(profile.skills)
         profile_data = profile.dict(exclude={"skills"})
-        new_profile = create_instance(
+        new_profile = await create_instance_async(
             db, Profile, user_id=user.id, skills=skills_str, **profile_data
         )
         return {
@@ -51,16 +77,16 @@ def create_profile(
         }
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
 
-@router.get("/profile")
-def get_my_profile(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+@router.get("/profile", responses=AUTH_RESPONSES)
+async def get_my_profile(
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user),
 ):
-    profile = get_instance_or_404(db, Profile)
+    profile = await get_instance_or_404_async(db, Profile)
     return {
         "bio": profile.bio,
         "skills": profile.skills.split(",") if profile.skills else [],
@@ -71,36 +97,39 @@ def get_my_profile(
     }
 
 
-@router.put("/profile")
-def update_profile(
+@router.put("/profile", responses=AUTH_RESPONSES)
+async def update_profile(
     update_profile: UpdateProfile,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user),
 ):
-    profile = get_user_profile(user, db)
+    profile = await get_user_profile(user, db)
     update_data = update_profile.dict(exclude_unset=True)
 
     if "skills" in update_data:
         update_data["skills"] = ",".join(update_data["skills"])
 
-    updated_profile = update_instance(db, profile, update_data)
+    updated_profile = await update_instance_async(db, profile, update_data)
 
     return {"message": "Profile updated successfully", "profile_id": updated_profile.id}
 
 
-@router.delete("/profile")
-def delete_user_profile(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+@router.delete("/profile", responses=AUTH_RESPONSES)
+async def delete_user_profile(
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user),
 ):
-    profile = get_user_profile(user, db)
-    delete_instance(db, profile)
+    profile = await get_user_profile(user, db)
+    await delete_instance_async(db, profile)
     return {"message": "Profile deleted successfully"}
 
 
-@router.get("/freelancers/search")
-def search_freelancers(
+@router.get("/freelancers/search", responses=AUTH_RESPONSES)
+async def search_freelancers(
     skill: Optional[str] = Query(None, description="Comma separated list of skills"),
+    skill_match: str = Query(
+        "any", enum=["any", "all"], description="Match any or all of the skills"
+    ),
     min_rate: Optional[float] = Query(None),
     max_rate: Optional[float] = Query(None),
     location: Optional[str] = Query(None),
@@ -110,8 +139,18 @@ def search_freelancers(
     sort_by: Optional[str] = Query(
         None, description="Sort by 'hourly_rate', 'available', or 'location'"
     ),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    pagination: str = Query(
+        "offset", enum=["offset", "keyset"], description="Pagination mode"
+    ),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a page"),
+    totals: str = Query(
+        "exact",
+        enum=TOTALS_MODES,
+        description="exact total, cached approximate total, or has_more only",
+    ),
+    db: AsyncSession = Depends(get_session(read_only=True)),
+    user: Principal = Depends(get_current_user),
+    cache: CacheEntry = Depends(ResponseCache(ttl=300, tags=["profiles", "users"])),
 ):
 
     if user.role not in ("client", "admin"):
@@ -119,40 +158,56 @@ def search_freelancers(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access denied"
         )
 
-    query = db.query(Profile).join(User)
+    cached = await cache.get()
+    if cached is not None:
+        return cached
 
-    if skill:
-        skills_list = [s.strip().lower() for s in skill.split(",")]
+    query = (
+        select(Profile).join(User).options(*FREELANCER_FIELDS.options(joined=["user"]))
+    )
 
-        from sqlalchemy import or_
-
-        skill_filters = [Profile.skills.ilike(f"%{s}%") for s in skills_list]
-        query = query.filter(or_(*skill_filters))
+    matched = None
+    skills_list = normalize_skills(skill.split(",") if skill else [])
+    if skills_list:
+        # indexed join on profile_skills
+        matched = match_profiles(skills_list, match_all=skill_match == "all")
+        query = query.join(matched, matched.c.profile_id == Profile.id)
 
     if min_rate is not None:
-        query = query.filter(Profile.hourly_rate >= min_rate)
+        query = query.where(Profile.hourly_rate >= min_rate)
 
     if max_rate is not None:
-        query = query.filter(Profile.hourly_rate <= max_rate)
+        query = query.where(Profile.hourly_rate <= max_rate)
 
     if location:
-        query = query.filter(Profile.location.ilike(f"%{location}%"))
+        query = query.where(Profile.location.ilike(f"%{location}%"))
 
     if available is not None:
-        query = query.filter(Profile.available == available)
+        query = query.where(Profile.available == available)
 
+    # the requested order first; best skill matches first by default and
+    # among equals, then the id (cursors carry the keys in this order)
+    sort_keys = []
     if sort_by:
         if sort_by == "hourly_rate":
-            query = query.order_by(Profile.hourly_rate.asc())
+            sort_keys.append(("hourly_rate", Profile.hourly_rate, False))
         elif sort_by == "available":
-            query = query.order_by(Profile.available.desc())
+            sort_keys.append(("available", Profile.available, True))
         elif sort_by == "location":
-            query = query.order_by(Profile.location.asc())
+            sort_keys.append(("location", Profile.location, False))
         else:
             raise HTTPException(status_code=400, detail="Invalid sort_by value")
-
-    total = query.count()
-    results = query.limit(limit).offset(offset).all()
+    if matched is not None:
+        sort_keys.append(("matched", matched.c.matched, True))
+    sort_keys.append(("id", Profile.id, False))
+
+    if cursor or pagination == "keyset":
+        page = await paginate_keyset(db, query, sort_keys, limit, cursor)
+        page.update(await count_total(db, query, totals))
+        page["has_more"] = page["next_cursor"] is not None
+    else:
+        page = await paginate_offset(db, query, sort_keys, limit, offset, totals)
+    results = page.pop("items")
 
     response = [
         {
@@ -168,9 +223,27 @@ def search_freelancers(
         for profile in results
     ]
 
-    return {
-        "total": total,
+    response_data = {
+        "total": page.pop("total"),
         "limit": limit,
         "offset": offset,
+        **page,
         "freelancers": response,
     }
+    return await cache.set(response_data)
+
+
+@router.get("/export", responses=AUTH_RESPONSES)
+async def export_profiles(
+    request: Request,
+    format: str = Query("ndjson", enum=EXPORT_FORMATS, description="Export format"),
+    user: Principal = Depends(admin_require),
+):
+    """Stream every profile with its user's name and email (app/utils/export.py)."""
+    stmt = (
+        FREELANCER_FIELDS.select()
+        .join(User, User.id == Profile.user_id)
+        .order_by(Profile.id)
+    )
+    gzip = accepts_gzip(request.headers.get("accept-encoding"))
+    return export_response(stmt, format, "profiles", gzip=gzip)
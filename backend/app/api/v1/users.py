@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ...models.user import User
 from ...schemas.user import (
     CreateUser,
@@ -9,10 +10,16 @@ from ...schemas.user import (
     UpdateUser,
 )
 
-from ...db.dependencies.get_db import get_db
-from ...core.hashing import hash_password, verify_password
+from ...db.dependencies.get_db import get_async_db
+from ...core.security import ALGORITHM, SECRET_KEY, Principal
+from ...core.hashing import (
+    hash_password_async,
+    verify_and_update_async,
+    verify_password_async,
+)
 
 from .auth import (
+    AUTH_RESPONSES,
     create_access_token,
     get_current_user,
     admin_require,
@@ -20,50 +27,70 @@ from .auth import (
 )
 import uuid
 from typing import Literal, Optional
-import os
-from dotenv import load_dotenv
-from ...utils.crud import create_instance
+from ...utils.crud import create_instance_async
+from ...utils.users import get_user_by_id
+from ...utils.pagination import (
+    TOTALS_MODES,
+    count_total,
+    paginate_keyset,
+    paginate_offset,
+)
+from ...middleware.cache import invalidate, invalidate_tags
+from ...utils.projection import Projection
+from ...utils.export import EXPORT_FORMATS, accepts_gzip, export_response
 
 router = APIRouter()
 
-load_dotenv()
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
-SECRET_KEY = os.getenv("SECRET_KEY")
+# the admin user listing, without the password hash
+USER_LIST_FIELDS = Projection(
+    User, "id", "name", "email", "role", "is_banned", "created_at", "updated_at"
+)
 
 
 @router.post(
     "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
-def register(user: CreateUser, db: Session = Depends(get_db)):
+async def register(user: CreateUser, db: AsyncSession = Depends(get_async_db)):
 
-    existing_user = (
-        db.query(User).filter(User.email == user.email.strip().lower()).first()
+    existing_user = await db.scalar(
+        select(User).where(User.email == user.email.strip().lower())
     )
     if existing_user:
         raise HTTPException(status_code=409, detail="user is already exit")
 
     user_data = user.dict()
     user_data["email"] = user_data["email"].strip().lower()
-    user_data["password"] = hash_password(user_data["password"])  # ✅ Hash the password
+    user_data["password"] = await hash_password_async(
+        user_data["password"]
+    )  # ✅ Hash the password
 
-    new_user = create_instance(db, User, **user_data)
+    new_user = await create_instance_async(db, User, **user_data)
     return new_user
 
 
 @router.post("/login", status_code=status.HTTP_202_ACCEPTED)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
 
-    existing_user = (
-        db.query(User).filter(User.email == user.email.strip().lower()).first()
+    existing_user = await db.scalar(
+        select(User).where(User.email == user.email.strip().lower())
     )
     if not existing_user:
         raise HTTPException(status_code=404, detail="user not found")
 
-    if not verify_password(user.password, existing_user.password):
+    verified, new_hash = await verify_and_update_async(
+        user.password, existing_user.password
+    )
+    if not verified:
         raise HTTPException(status_code=401, detail="Password not correct")
 
+    if new_hash:
+        # stored with an older bcrypt cost; upgrading is best effort
+        try:
+            existing_user.password = new_hash
+            await db.commit()
+        except Exception:
+            await db.rollback()
+
     access_token = create_access_token(
         {
             "email": existing_user.email,
@@ -83,7 +110,9 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh-token")
-def refresh_token(token: str = Body(...), db: Session = Depends(get_db)):
+async def refresh_token(
+    token: str = Body(...), db: AsyncSession = Depends(get_async_db)
+):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("id")
@@ -93,7 +122,7 @@ def refresh_token(token: str = Body(...), db: Session = Depends(get_db)):
         if not email or not role:
             raise HTTPException(status_code=404, detail="invalid token")
 
-        db_user = db.query(User).filter(User.email == email).first()
+        db_user = await db.scalar(select(User).where(User.email == email))
         if not db_user:
             raise HTTPException(status_code=404, detail="User not found")
         new_access_token = create_access_token(
@@ -105,8 +134,8 @@ def refresh_token(token: str = Body(...), db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
 
-@router.get("/user")
-def get_user(current_user: User = Depends(get_current_user)):
+@router.get("/user", responses=AUTH_RESPONSES)
+async def get_user(current_user: Principal = Depends(get_current_user)):
     return {
         "name": current_user.name,
         "role": current_user.role,
@@ -114,31 +143,47 @@ def get_user(current_user: User = Depends(get_current_user)):
     }
 
 
-@router.get("/admin/user")
-def get_all_user(
-    user: UserResponse = Depends(admin_require),
-    db: Session = Depends(get_db),
+@router.get("/admin/user", responses=AUTH_RESPONSES)
+async def get_all_user(
+    user: Principal = Depends(admin_require),
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(5, ge=1, le=10),
     role: Optional[Literal["client", "freelance"]] = None,
     is_banned: Optional[bool] = None,
     skip: int = Query(0, ge=0),
+    pagination: Literal["offset", "keyset"] = "offset",
+    cursor: Optional[str] = None,
+    totals: str = Query(
+        "exact",
+        enum=TOTALS_MODES,
+        description="exact total, cached approximate total, or has_more only",
+    ),
 ):
     try:
-        query = db.query(User).filter(User.role != "admin")
+        query = USER_LIST_FIELDS.select().where(User.role != "admin")
 
         if role is not None:
-            query = query.filter(User.role == role)
+            query = query.where(User.role == role)
         if is_banned is not None:
-            query = query.filter(User.is_banned == is_banned)
-
-        total = query.count()
-        users = query.order_by(User.name).offset(skip).limit(limit).all()
+            query = query.where(User.is_banned == is_banned)
+
+        sort_keys = [("name", User.name, False), ("id", User.id, False)]
+        if cursor or pagination == "keyset":
+            page = await paginate_keyset(db, query, sort_keys, limit, cursor)
+            page.update(await count_total(db, query, totals))
+            page["has_more"] = page["next_cursor"] is not None
+        else:
+            page = await paginate_offset(db, query, sort_keys, limit, skip, totals)
+        users = page.pop("items")
         return {
-            "total": total,
+            "total": page.pop("total"),
             "limit": limit,
             "skip": skip,
+            **page,
             "users": [db_user for db_user in users],
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -146,17 +191,37 @@ def get_all_user(
         )
 
 
-@router.put("/user")
-def update_user(
+@router.get("/admin/users/export", responses=AUTH_RESPONSES)
+async def export_users(
+    request: Request,
+    user: Principal = Depends(admin_require),
+    format: str = Query("ndjson", enum=EXPORT_FORMATS, description="Export format"),
+    role: Optional[Literal["client", "freelance"]] = None,
+    is_banned: Optional[bool] = None,
+):
+    """Stream every non-admin user, oldest first (app/utils/export.py)."""
+    stmt = USER_LIST_FIELDS.select().where(User.role != "admin")
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    if is_banned is not None:
+        stmt = stmt.where(User.is_banned == is_banned)
+    stmt = stmt.order_by(User.created_at, User.id)
+    gzip = accepts_gzip(request.headers.get("accept-encoding"))
+    return export_response(stmt, format, "users", gzip=gzip)
+
+
+@router.put("/user", responses=AUTH_RESPONSES)
+async def update_user(
     user: UpdateUser,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_user),
 ):
+    current_user = await get_user_by_id(principal, db)
     updated = False
     if user.email is not None:
         new_email = user.email.strip().lower()
         if new_email != current_user.email:
-            existing_user = db.query(User).filter(User.email == new_email).first()
+            existing_user = await db.scalar(select(User).where(User.email == new_email))
             if existing_user:
                 raise HTTPException(status_code=409, detail="Email already in use")
             current_user.email = new_email
@@ -167,7 +232,7 @@ def update_user(
         updated = True
 
     if user.password is not None:
-        current_user.password = hash_password(user.password)
+        current_user.password = await hash_password_async(user.password)
         updated = True
 
     if user.role is not None:
@@ -176,14 +241,15 @@ def update_user(
 
     if updated:
         try:
-            db.commit()
-            db.refresh(current_user)
+            await db.commit()
+            await db.refresh(current_user)
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update user",
             )
+        await invalidate(current_user)
 
     return {
         "name": current_user.name,
@@ -192,9 +258,11 @@ def update_user(
     }
 
 
-@router.put("/admin/user/{id}/ban")
-def toggle_bon(
-    id: str, user: User = Depends(admin_require), db: Session = Depends(get_db)
+@router.put("/admin/user/{id}/ban", responses=AUTH_RESPONSES)
+async def toggle_bon(
+    id: str,
+    user: Principal = Depends(admin_require),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     try:
@@ -202,7 +270,7 @@ def toggle_bon(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    target_user = db.query(User).filter(User.id == id).first()
+    target_user = await db.get(User, id)
     if not target_user:
         raise HTTPException(status_code=403, detail="user not found")
     if target_user.role == "admin":
@@ -210,22 +278,27 @@ def toggle_bon(
 
     try:
         target_user.is_banned = not target_user.is_banned
-        db.commit()
-        db.refresh(target_user)
+        await db.commit()
+        await db.refresh(target_user)
+        await invalidate(target_user)
         action = "banned" if target_user.is_banned else "unbanned"
         return {"detail": f"User {target_user.email} has been {action}."}
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while ban the user",
         )
 
 
-@router.delete("/admin/user/{id}", status_code=status.HTTP_200_OK)
-def delete_user_by_admin(
-    id: str, user: User = Depends(admin_require), db: Session = Depends(get_db)
+@router.delete(
+    "/admin/user/{id}", status_code=status.HTTP_200_OK, responses=AUTH_RESPONSES
+)
+async def delete_user_by_admin(
+    id: str,
+    user: Principal = Depends(admin_require),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     try:
@@ -233,68 +306,68 @@ def delete_user_by_admin(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
-    user = db.query(User).filter(User.id == id).first()
+    target_user = await db.get(User, id)
 
-    if not user:
+    if not target_user:
         raise HTTPException(status_code=403, detail="user not found")
 
-    if user.role == "admin":
+    if target_user.role == "admin":
         raise HTTPException(status_code=400, detail="Admin cannot delete themselves.")
 
     try:
-        db.delete(user)
-        db.commit()
+        await db.delete(target_user)
+        await db.commit()
+        await invalidate(target_user)
+        await invalidate_tags("jobs", "profiles")
         return {"detail": f"User with ID {id} deleted successfully"}
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while deleting the user",
         )
 
 
-@router.delete("/user")
-def logout(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+@router.delete("/user", responses=AUTH_RESPONSES)
+async def logout(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
 
-    user = db.query(User).filter(User.email == current_user.email).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User Not Found"
-        )
+    user = await get_user_by_id(current_user, db)
     try:
-        db.delete(user)
-        db.commit()
+        await db.delete(user)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete user",
         )
+    await invalidate(user)
+    await invalidate_tags("jobs", "profiles")
     return {"detail": "User deleted successfully"}
 
 
-@router.put("/user/password")
-def change_password(
+@router.put("/user/password", responses=AUTH_RESPONSES)
+async def change_password(
     current_password: str = Body(...),
     new_password: str = Body(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_user),
 ):
-    if not current_user:
-        raise HTTPException(status_code=404, detail="User not found")
+    current_user = await get_user_by_id(principal, db)
 
-    if not verify_password(current_password, current_user.password):
+    if not await verify_password_async(current_password, current_user.password):
         raise HTTPException(status_code=401, detail="password incorrect")
+    # outside the try: a full hashing queue answers 503 with Retry-After
+    current_user.password = await hash_password_async(new_password)
     try:
-        current_user.password = hash_password(new_password)
-        db.commit()
-        db.refresh(current_user)
-        return {"detail": "Password updated successfully"}
-
+        await db.commit()
+        await db.refresh(current_user)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to update password")
+    await invalidate(current_user)
+    return {"detail": "Password updated successfully"}
@@ -0,0 +1,152 @@
+"""Replay the hot routes and report query plans with full scans or filesorts.
+
+    python -m app.commands.index_advisor [--verbose]
+
+Each scenario below is sent through the app in-process; every SELECT it
+issues is captured and EXPLAINed on the configured database (MySQL EXPLAIN or
+SQLite EXPLAIN QUERY PLAN). Run it against a database seeded to a realistic
+size: on a nearly empty table MySQL prefers a full scan whatever the indexes.
+Exits with status 1 when a plan needs attention, so it can gate CI. Add a
+scenario when adding a list or search endpoint.
+"""
+
+import argparse
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+
+from ..api.v1.auth import create_access_token
+from ..db.database import Base, async_engine, async_reader_engine, engine
+from ..main import app
+from ..models.user import User
+
+API = "/app/api/v1"
+
+# (role whose token is sent or None, path, query params)
+SCENARIOS = [
+    (None, "/jobs/search", {}),
+    (None, "/jobs/search", {"query": "python developer"}),
+    (None, "/jobs/search", {"budget_min": 100, "order_by": "budget"}),
+    (None, "/jobs/search", {"pagination": "keyset", "totals": "has_more"}),
+    ("client", "/ClientDashboard/job/Panel", {}),
+    ("client", "/ClientDashboard/job/Panel", {"status": "open"}),
+    (None, "/ClientDashboard/Admin/Dashboard", {}),
+    ("admin", "/users/admin/user", {"role": "client"}),
+    ("client", "/profiles/freelancers/search", {"min_rate": 10}),
+    ("client", "/profiles/freelancers/search", {"available": True}),
+    ("client", "/profiles/freelancers/search", {"skill": "python"}),
+]
+
+
+def _tokens() -> dict:
+    with engine.connect() as connection:
+        users = {
+            role: connection.execute(
+                select(User.id, User.email).where(User.role == role).limit(1)
+            ).first()
+            for role in ("client", "admin")
+        }
+    return {
+        role: create_access_token({"email": row.email, "id": str(row.id), "role": role})
+        for role, row in users.items()
+        if row is not None
+    }
+
+
+def capture(scenarios) -> list:
+    """Run the scenarios; returns ``(scenario, statement, parameters)``."""
+    captured = []
+    current = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((current[0], statement, parameters))
+
+    engines = {async_engine.sync_engine, async_reader_engine.sync_engine}
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        tokens = _tokens()
+        with TestClient(app) as client:
+            for role, path, params in scenarios:
+                if role and role not in tokens:
+                    print(f"skipped {path}: no {role} user in the database")
+                    continue
+                current[:] = [f"{path} {params}"]
+                headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+                # a fresh parameter keeps the response cache out of the way
+                response = client.get(
+                    API + path,
+                    params={**params, "advisor": uuid.uuid4().hex},
+                    headers=headers,
+                )
+                if response.status_code >= 400:
+                    print(f"{path} {params}: HTTP {response.status_code}")
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def _sqlite_problem(detail: str) -> bool:
+    words = detail.split()
+    if words[0] == "SCAN":
+        # scans of subquery results are fine, only whole tables count
+        return words[1] in Base.metadata.tables and "INDEX" not in detail
+    # sorting the tie-breaking key of an index-ordered scan is cheap
+    return "TEMP B-TREE" in detail and "RIGHT PART" not in detail
+
+
+def explain(connection, statement: str, parameters) -> tuple:
+    """Plan rows as dicts and the problems found in them."""
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        ).mappings()
+        plan = [dict(row) for row in rows]
+        return plan, [row["detail"] for row in plan if _sqlite_problem(row["detail"])]
+
+    rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings()
+    plan = [dict(row) for row in rows]
+    problems = []
+    for row in plan:
+        extra = row.get("Extra") or ""
+        if row.get("type") == "ALL":
+            problems.append(f"full scan of {row['table']} (~{row.get('rows')} rows)")
+        if "filesort" in extra:
+            problems.append(f"filesort on {row['table']}")
+        if "temporary" in extra:
+            problems.append(f"temporary table for {row['table']}")
+    return plan, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query plan based index advisor")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    seen = set()
+    flagged = 0
+    with engine.connect() as connection:
+        for scenario, statement, parameters in capture(SCENARIOS):
+            if statement in seen:
+                continue
+            seen.add(statement)
+            plan, problems = explain(connection, statement, parameters)
+            if not problems and not args.verbose:
+                continue
+            flagged += bool(problems)
+            print(f"\n== {scenario}\n{' '.join(statement.split())}")
+            for row in plan if args.verbose else []:
+                print(f"   {row}")
+            for problem in problems:
+                print(f"  ! {problem}")
+
+    print(f"\n{len(seen)} distinct statements, {flagged} need attention")
+    if flagged:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Rebuild or check the per-client job statistics (client_job_stats).
+
+    python -m app.commands.job_stats rebuild [--batch-size 500]
+    python -m app.commands.job_stats verify
+
+Rebuild recomputes each batch of users in its own transaction; run it while
+job writes are quiet, as a write racing with its batch can be lost.
+"""
+
+import argparse
+import math
+
+from sqlalchemy import delete, insert, select
+
+from ..crud.job import compute_job_stats
+from ..db.database import sessionLocal
+from ..models.stats import ClientJobStat
+from ..models.user import User
+
+STAT_FIELDS = ("job_count", "active_count", "total_budget")
+
+
+def _stored(db, user_ids) -> dict:
+    rows = db.scalars(select(ClientJobStat).where(ClientJobStat.user_id.in_(user_ids)))
+    return {
+        (row.user_id, row.status, row.work_mode): [
+            getattr(row, field) for field in STAT_FIELDS
+        ]
+        for row in rows
+        if row.job_count or row.active_count or row.total_budget
+    }
+
+
+def _user_batches(db, batch_size: int):
+    last_id = ""
+    while True:
+        ids = db.scalars(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        ).all()
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def rebuild(batch_size: int):
+    rebuilt = 0
+    with sessionLocal() as db:
+        for user_ids in _user_batches(db, batch_size):
+            connection = db.connection()
+            stats = compute_job_stats(connection, user_ids)
+            connection.execute(
+                delete(ClientJobStat).where(ClientJobStat.user_id.in_(user_ids))
+            )
+            if stats:
+                connection.execute(
+                    insert(ClientJobStat),
+                    [
+                        dict(
+                            zip(("user_id", "status", "work_mode"), key),
+                            **dict(zip(STAT_FIELDS, values)),
+                        )
+                        for key, values in stats.items()
+                    ],
+                )
+            db.commit()
+            rebuilt += len(user_ids)
+            print(f"rebuilt statistics of {rebuilt} users")
+
+
+def _same(expected, actual) -> bool:
+    return expected[:2] == actual[:2] and math.isclose(
+        expected[2], actual[2], rel_tol=1e-9, abs_tol=1e-6
+    )
+
+
+def verify(batch_size: int = 500):
+    wrong = set()
+    with sessionLocal() as db:
+        for user_ids in _user_batches(db, batch_size):
+            expected = compute_job_stats(db.connection(), user_ids)
+            actual = _stored(db, user_ids)
+            for key in expected.keys() | actual.keys():
+                if not _same(
+                    expected.get(key, [0, 0, 0.0]), actual.get(key, [0, 0, 0.0])
+                ):
+                    wrong.add(key[0])
+    print(f"{len(wrong)} users have wrong job statistics")
+    return not wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client job statistics maintenance")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild(args.batch_size)
+    elif not verify(args.batch_size):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
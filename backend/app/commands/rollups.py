@@ -0,0 +1,48 @@
+"""Fill the admin analytics rollups (signups and job postings).
+
+    python -m app.commands.rollups run
+    python -m app.commands.rollups rebuild
+
+``run`` continues from the stored watermarks, ``rebuild`` drops them and
+re-aggregates the whole history.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import delete
+
+from ..db.database import sessionLocal
+from ..models.rollup import JobRollup, RollupWatermark, SignupRollup
+from ..middleware.cache import invalidate_tags
+from ..utils.rollups import ROLLUPS_TAG, run_rollups
+
+
+def rebuild():
+    with sessionLocal() as db:
+        for model in (RollupWatermark, SignupRollup, JobRollup):
+            db.execute(delete(model))
+        db.commit()
+    run()
+
+
+def run():
+    for name, hours in run_rollups().items():
+        print(f"{name}: rolled up {hours} hours")
+    # cached dashboards were built from the previous facts
+    asyncio.run(invalidate_tags(ROLLUPS_TAG))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin analytics rollups")
+    parser.add_argument("command", choices=["run", "rebuild"])
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild()
+    else:
+        run()
+
+
+if __name__ == "__main__":
+    main()
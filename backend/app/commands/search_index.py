@@ -0,0 +1,68 @@
+"""Rebuild or check the job search inverted index.
+
+    python -m app.commands.search_index rebuild [--batch-size 1000]
+    python -m app.commands.search_index verify
+
+``rebuild`` re-indexes every job, ``verify`` exits with status 1 when some
+job has no index entries.
+"""
+
+import argparse
+
+from sqlalchemy import func, select
+
+from ..db.database import sessionLocal
+from ..models.job import Job
+from ..models.search import JobSearchTerm
+from ..utils.search import INDEXED_FIELDS, index_jobs
+
+COLUMNS = [Job.id] + [getattr(Job, column) for column, _ in INDEXED_FIELDS.values()]
+
+
+def rebuild(batch_size: int):
+    indexed = 0
+    with sessionLocal() as db:
+        last_id = ""
+        while True:
+            rows = db.execute(
+                select(*COLUMNS)
+                .where(Job.id > last_id)
+                .order_by(Job.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            index_jobs(db.connection(), [row._asdict() for row in rows])
+            db.commit()
+            indexed += len(rows)
+            last_id = rows[-1].id
+            print(f"indexed {indexed} jobs")
+
+
+def verify():
+    with sessionLocal() as db:
+        unindexed = db.scalar(
+            select(func.count(Job.id)).where(
+                ~select(JobSearchTerm.job_id)
+                .where(JobSearchTerm.job_id == Job.id)
+                .exists()
+            )
+        )
+    print(f"{unindexed} jobs have no index entries")
+    return unindexed == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job search index maintenance")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild(args.batch_size)
+    elif not verify():
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
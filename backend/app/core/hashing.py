@@ -1,8 +1,19 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 
+from ..config import settings
+
 my_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
 )
 
 
@@ -14,3 +25,62 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain: str, hash: str) -> bool:
     return my_context.verify(plain, hash)
+
+
+def verify_and_update(plain: str, hash: str) -> Tuple[bool, Optional[str]]:
+    """Verify, and return a new hash when ``hash`` uses an outdated cost."""
+    return my_context.verify_and_update(plain, hash)
+
+
+# bcrypt is pure CPU; it runs in worker processes so a login burst cannot hold
+# the event loop or the threadpool that every other endpoint shares.
+_executor: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def start_hasher():
+    global _executor, _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(
+            max(settings.hash_pool_workers, 1) + settings.hash_queue_size
+        )
+    if _executor is None and settings.hash_pool_workers > 0:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.hash_pool_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+
+def stop_hasher():
+    global _executor, _slots
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+    _executor = None
+    _slots = None
+
+
+async def _run(func, *args):
+    start_hasher()
+    if _slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations in progress, try again shortly",
+            headers={"Retry-After": str(settings.hash_retry_after)},
+        )
+    async with _slots:
+        if _executor is None:
+            return await run_in_threadpool(func, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, partial(func, *args))
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password)
+
+
+async def verify_password_async(plain: str, hash: str) -> bool:
+    return await _run(verify_password, plain, hash)
+
+
+async def verify_and_update_async(plain: str, hash: str) -> Tuple[bool, Optional[str]]:
+    return await _run(verify_and_update, plain, hash)
@@ -0,0 +1,48 @@
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from jose import jwt, JWTError
+
+from ..config import settings
+
+SECRET_KEY = settings.secret_key
+ALGORITHM = settings.algorithm
+
+
+def bearer_claims(authorization: Optional[str]) -> Optional[dict]:
+    """Claims of a valid ``Bearer`` token header value, without a DB lookup."""
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not credentials:
+        return None
+    try:
+        return jwt.decode(credentials, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by route handlers.
+
+    A snapshot of the ``user`` row cached by ``get_current_user``; handlers
+    that write to the user load the row itself.
+    """
+
+    id: str
+    email: str
+    name: str
+    role: str
+    is_banned: bool = False
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=str(user.id),
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            is_banned=bool(user.is_banned),
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
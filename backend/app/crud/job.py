@@ -0,0 +1,121 @@
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete, event, func, insert, select, update
+from sqlalchemy.orm import Session, attributes
+
+from ..models.job import Job
+from ..models.stats import ClientJobStat
+from ..models.user import User
+
+# Job columns the per-client statistics depend on
+STAT_COLUMNS = ("user_id", "status", "work_mode", "is_active", "budget")
+
+
+def new_deltas() -> defaultdict:
+    """Pending changes per ``(user_id, status, work_mode)``:
+    ``[job_count, active_count, total_budget]``."""
+    return defaultdict(lambda: [0, 0, 0.0])
+
+
+def add_job(deltas, values: dict, sign: int = 1):
+    """Count a job given its STAT_COLUMNS values (``sign=-1`` removes it)."""
+    delta = deltas[
+        (values["user_id"], values["status"] or "", values["work_mode"] or "")
+    ]
+    delta[0] += sign
+    # is_active defaults to true when the job is inserted
+    delta[1] += sign if values["is_active"] is not False else 0
+    delta[2] += sign * (values["budget"] or 0.0)
+
+
+def apply_job_stats(connection, deltas):
+    """Add the pending deltas to client_job_stats."""
+    for (user_id, status, work_mode), (count, active, budget) in deltas.items():
+        if not count and not active and not budget:
+            continue
+        key = {"user_id": user_id, "status": status, "work_mode": work_mode}
+        # create the row if needed, then increment it; both are race free
+        connection.execute(
+            insert(ClientJobStat)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+            .values(**key, job_count=0, active_count=0, total_budget=0.0)
+        )
+        connection.execute(
+            update(ClientJobStat)
+            .where(
+                ClientJobStat.user_id == user_id,
+                ClientJobStat.status == status,
+                ClientJobStat.work_mode == work_mode,
+            )
+            .values(
+                job_count=ClientJobStat.job_count + count,
+                active_count=ClientJobStat.active_count + active,
+                total_budget=ClientJobStat.total_budget + budget,
+            )
+        )
+
+
+def compute_job_stats(connection, user_ids: Optional[Iterable[str]] = None) -> dict:
+    """Statistics recomputed from the jobs table, keyed like the deltas."""
+    status = func.coalesce(Job.status, "")
+    work_mode = func.coalesce(Job.work_mode, "")
+    stmt = select(
+        Job.user_id,
+        status,
+        work_mode,
+        func.count(Job.id),
+        func.sum(case((Job.is_active == False, 0), else_=1)),
+        func.coalesce(func.sum(Job.budget), 0.0),
+    ).group_by(Job.user_id, status, work_mode)
+    if user_ids is not None:
+        stmt = stmt.where(Job.user_id.in_(list(user_ids)))
+    return {
+        (user_id, s, wm): [count, active, budget]
+        for user_id, s, wm, count, active, budget in connection.execute(stmt)
+    }
+
+
+def _values(job: Job, old: bool = False) -> dict:
+    values = {}
+    state = attributes.instance_state(job)
+    for column in STAT_COLUMNS:
+        history = state.attrs[column].history
+        if old and history.deleted:
+            values[column] = history.deleted[0]
+        else:
+            values[column] = getattr(job, column)
+    return values
+
+
+def _stats_changed(job: Job) -> bool:
+    state = attributes.instance_state(job)
+    return any(state.attrs[column].history.has_changes() for column in STAT_COLUMNS)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_job_stats(session, flush_context):
+    """Apply job inserts, updates and deletes to client_job_stats in the same
+    transaction."""
+    deltas = new_deltas()
+    for obj in session.new:
+        if isinstance(obj, Job):
+            add_job(deltas, _values(obj))
+    for obj in session.dirty:
+        if isinstance(obj, Job) and _stats_changed(obj):
+            add_job(deltas, _values(obj, old=True), -1)
+            add_job(deltas, _values(obj))
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            add_job(deltas, _values(obj, old=True), -1)
+
+    gone = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    for key in [key for key in deltas if key[0] in gone]:
+        del deltas[key]
+    if gone:
+        session.connection().execute(
+            delete(ClientJobStat).where(ClientJobStat.user_id.in_(gone))
+        )
+    if deltas:
+        apply_job_stats(session.connection(), deltas)
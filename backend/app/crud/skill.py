@@ -0,0 +1,96 @@
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session, attributes
+
+from ..models.profile import Profile
+from ..models.skill import Skill, profile_skills
+
+
+def normalize_skills(names: Optional[Iterable[str]]) -> list:
+    """Lowercased, stripped and de-duplicated skill names, in input order."""
+    seen = []
+    for name in names or []:
+        name = name.strip().lower()[:100]
+        if name and name not in seen:
+            seen.append(name)
+    return seen
+
+
+def skill_ids(connection, names: Sequence[str]) -> list:
+    """Ids of the named skills, creating the missing ones."""
+    if not names:
+        return []
+    existing = dict(
+        connection.execute(
+            select(Skill.name, Skill.id).where(Skill.name.in_(names))
+        ).all()
+    )
+    missing = [name for name in names if name not in existing]
+    if missing:
+        # concurrent writers may create the same skill; the loser just skips it
+        connection.execute(
+            insert(Skill)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite"),
+            [{"name": name} for name in missing],
+        )
+        existing.update(
+            connection.execute(
+                select(Skill.name, Skill.id).where(Skill.name.in_(missing))
+            ).all()
+        )
+    return [existing[name] for name in names]
+
+
+def set_profile_skills(connection, profile_id: str, names: Iterable[str]):
+    """Replace the skill links of a profile."""
+    ids = skill_ids(connection, normalize_skills(names))
+    connection.execute(
+        delete(profile_skills).where(profile_skills.c.profile_id == profile_id)
+    )
+    if ids:
+        connection.execute(
+            insert(profile_skills),
+            [{"profile_id": profile_id, "skill_id": skill_id} for skill_id in ids],
+        )
+
+
+def match_profiles(names: Sequence[str], match_all: bool = False):
+    """Subquery of ``(profile_id, matched)`` for profiles having the skills.
+
+    ``matched`` is the number of requested skills the profile has; with
+    ``match_all`` only profiles having every skill are returned.
+    """
+    stmt = (
+        select(
+            profile_skills.c.profile_id,
+            func.count(profile_skills.c.skill_id).label("matched"),
+        )
+        .join(Skill, Skill.id == profile_skills.c.skill_id)
+        .where(Skill.name.in_(names))
+        .group_by(profile_skills.c.profile_id)
+    )
+    if match_all:
+        stmt = stmt.having(func.count(profile_skills.c.skill_id) == len(names))
+    return stmt.subquery()
+
+
+def _split(skills: Optional[str]) -> list:
+    return skills.split(",") if skills else []
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_profile_skills(session, flush_context):
+    """Mirror ``Profile.skills`` into profile_skills in the same transaction."""
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Profile):
+            continue
+        if obj in session.new or attributes.get_history(obj, "skills").has_changes():
+            set_profile_skills(session.connection(), obj.id, _split(obj.skills))
+
+    removed = [obj.id for obj in session.deleted if isinstance(obj, Profile)]
+    if removed:
+        session.connection().execute(
+            delete(profile_skills).where(profile_skills.c.profile_id.in_(removed))
+        )
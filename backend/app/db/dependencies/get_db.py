@@ -1,8 +1,28 @@
-from ...db.database import sessionLocal
+from ...db.database import (
+    sessionLocal,
+    asyncSessionLocal,
+    asyncReaderSessionLocal,
+)
 
 def get_db () :
     db = sessionLocal()
     try :
         yield db
     finally :
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with asyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_reader_db():
+    """Session on the read replica, for endpoints that never write."""
+    async with asyncReaderSessionLocal() as db:
+        yield db
+
+
+def get_session(read_only: bool = False):
+    """Pick the primary or replica session dependency for a route."""
+    return get_async_reader_db if read_only else get_async_db
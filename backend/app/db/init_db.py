@@ -0,0 +1,47 @@
+"""Create the schema of an empty database and hand it over to Alembic.
+
+The tables are created from the models and the database is stamped with the
+Alembic head, so later revisions apply with ``alembic upgrade head`` as
+usual. Meant for new development, test and benchmark databases (SQLite
+included); a database that already has tables is only ever migrated.
+
+    python -m app.db.init_db
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from ..models import (  # noqa: F401 (every table for create_all)
+    application,
+    job,
+    message,
+    profile,
+    review,
+    rollup,
+    search,
+    skill,
+    stats,
+    user,
+)
+from .database import Base, engine
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def init_db():
+    existing = inspect(engine).get_table_names()
+    if existing:
+        raise SystemExit(
+            f"{engine.url!r} already has tables ({', '.join(existing)}); "
+            "upgrade it with `alembic upgrade head` instead"
+        )
+    Base.metadata.create_all(bind=engine)
+    command.stamp(Config(str(ALEMBIC_INI)), "head")
+
+
+if __name__ == "__main__":
+    init_db()
+    print(f"created the schema of {engine.url!r}")
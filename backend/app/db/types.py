@@ -0,0 +1,87 @@
+"""Primary key ids: time-ordered UUIDv7 stored as BINARY(16).
+
+Random uuid4 text keys scatter inserts over the whole clustered index and make
+every secondary index carry a 36 character copy of the key. UUIDv7 ids start
+with a millisecond timestamp, so new rows are appended to the right edge of
+the index, and binary storage makes each key 16 bytes. The application only
+ever sees the canonical string form.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy.types import BINARY, TypeDecorator
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """A UUIDv7 (RFC 9562): 48 bits of Unix milliseconds, then random bits.
+
+    Ids made by one process are strictly increasing: within a millisecond the
+    12 bit ``rand_a`` field counts up from a random start, and when it runs
+    out (or the clock goes back) the timestamp is carried forward instead.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # the top bit stays clear so there is room to count up
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    return uuid.UUID(int=ms << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b)
+
+
+def new_id() -> str:
+    """A new primary key value, as the models and API use it."""
+    return str(uuid7())
+
+
+def id_bytes(value) -> bytes:
+    """The stored form of an id given as a string, ``UUID`` or raw bytes.
+
+    A string that is not a UUID gives ``b""``, which no stored id equals, so
+    looking up a malformed id finds nothing instead of raising.
+    """
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    try:
+        return uuid.UUID(value).bytes
+    except (AttributeError, TypeError, ValueError):
+        return b""
+
+
+class UUIDBinary(TypeDecorator):
+    """A UUID in a BINARY(16) column, read and written as its canonical
+    lowercase string. The byte order is that of the string, so ordering by
+    the column orders UUIDv7 ids by creation time."""
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return str
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return id_bytes(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=bytes(value)))
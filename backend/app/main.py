@@ -1,21 +1,87 @@
+from contextlib import asynccontextmanager
+from importlib import import_module
+from typing import Optional, Sequence
+
 from fastapi import FastAPI
-from .api.v1 import users, profiles, jobs
-from .db.database import Base, engine
-from app.middleware.redis import RateLimitMiddleware
-from app.api.v1 import ClientDashboard
+from fastapi.responses import ORJSONResponse
+from .config import settings
+from .db.database import (
+    async_engine,
+    async_reader_engine,
+    dispose_engines,
+    engine,
+    reader_engine,
+    warm_engines,
+)
+from app.middleware.redis import init_redis, close_redis
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.metrics import MetricsMiddleware, start_metrics, stop_metrics
+from app.middleware.query_stats import QueryStatsMiddleware, instrument_engines
+from app.core.hashing import start_hasher, stop_hasher
+from app.utils.rollups import start_rollup_scheduler, stop_rollup_scheduler
 
-Base.metadata.create_all(bind=engine)
+# name -> (module, mount prefix); modules are imported by create_app, and only
+# for the routers it mounts
+ROUTERS = {
+    "users": ("app.api.v1.users", "/app/api/v1/users"),
+    "profiles": ("app.api.v1.profiles", "/app/api/v1/profiles"),
+    "jobs": ("app.api.v1.jobs", "/app/api/v1/jobs"),
+    "ClientDashboard": ("app.api.v1.ClientDashboard", "/app/api/v1/ClientDashboard"),
+}
 
-app = FastAPI()
 
-app.add_middleware(RateLimitMiddleware)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is managed by Alembic (app/db/init_db.py for an empty
+    # database); startup only opens the pools the first requests will use.
+    await init_redis()
+    await warm_engines()
+    start_hasher()
+    start_rollup_scheduler()
+    start_metrics()
+    yield
+    await stop_metrics()
+    await stop_rollup_scheduler()
+    stop_hasher()
+    await close_redis()
+    await dispose_engines()
 
 
-app.include_router(users.router, prefix="/app/api/v1/users", tags=["users"])
-app.include_router(profiles.router, prefix="/app/api/v1/profiles", tags=["profiles"])
-app.include_router(jobs.router, prefix="/app/api/v1/jobs", tags=["jobs"])
-app.include_router(
-    ClientDashboard.router,
-    prefix="/app/api/v1/ClientDashboard",
-    tags=["ClientDashboard"],
-)
+def create_app(routers: Optional[Sequence[str]] = None) -> FastAPI:
+    """Build the application with the given routers (names in ``ROUTERS``),
+    by default ``settings.routers`` or all of them.
+
+    Serve it with ``uvicorn --factory app.main:create_app`` or through the
+    module level ``app``.
+    """
+    routers = routers or settings.routers or list(ROUTERS)
+    unknown = set(routers) - set(ROUTERS)
+    if unknown:
+        raise ValueError(f"Unknown routers: {', '.join(sorted(unknown))}")
+
+    # orjson for every response; cached ones are sent pre-encoded
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+    if settings.rate_limit_enabled:
+        app.add_middleware(RateLimitMiddleware)
+
+    if settings.sql_instrumentation:
+        instrument_engines(
+            engine,
+            reader_engine,
+            async_engine.sync_engine,
+            async_reader_engine.sync_engine,
+        )
+        app.add_middleware(QueryStatsMiddleware)
+
+    # outermost, so rate limited and failed requests are measured too
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
+    for name in routers:
+        module, prefix = ROUTERS[name]
+        app.include_router(import_module(module).router, prefix=prefix, tags=[name])
+    return app
+
+
+app = create_app()
@@ -0,0 +1,394 @@
+import asyncio
+import math
+import random
+import time
+from collections import Counter, OrderedDict
+from typing import Iterable, List, Optional, Sequence
+
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from ..core.security import bearer_claims
+from ..config import settings
+from ..models.job import Job
+from ..models.profile import Profile
+from ..models.user import User
+from ..utils.serialization import RawJSONResponse, dumps, loads
+from .redis import get_bytes_redis, get_redis, make_cache_key
+
+TAG_PREFIX = "cache:tag:"
+LOCK_PREFIX = "cache:lock:"
+
+# hits are counted per tier; "coalesced" callers waited for another's result
+stats = Counter()
+
+
+class LocalCache:
+    """Per-process LRU bounded by entry count and payload bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["local_exp"] <= now:
+            self.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: dict):
+        self.pop(key)
+        if entry["size"] > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.size += entry["size"]
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted["size"]
+            stats["evictions"] += 1
+
+    def pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry["size"]
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_cache = LocalCache(
+    settings.cache_local_max_entries, settings.cache_local_max_bytes
+)
+
+# tag -> (version, fetched_at); lets local hits skip Redis entirely
+_tag_versions = {}
+# cache key -> future resolved by the request computing it
+_inflight = {}
+
+
+def cache_stats() -> dict:
+    return {
+        **stats,
+        "local_entries": len(local_cache),
+        "local_bytes": local_cache.size,
+    }
+
+
+def model_tags(instance) -> List[str]:
+    """Cache tags affected by a write to ``instance``."""
+    if isinstance(instance, Job):
+        return ["jobs", f"jobs:user:{instance.user_id}"]
+    if isinstance(instance, Profile):
+        return ["profiles"]
+    if isinstance(instance, User):
+        return ["users", f"users:{instance.id}"]
+    return []
+
+
+async def invalidate_tags(*tags: str):
+    """Bump the tag versions so every entry cached under them turns stale."""
+    tags = sorted(set(tags))
+    if not tags:
+        return
+    try:
+        redis = await get_redis()
+        pipe = redis.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(TAG_PREFIX + tag)
+        versions = await pipe.execute()
+    except RedisError:
+        for tag in tags:
+            _tag_versions.pop(tag, None)
+        return
+    now = time.monotonic()
+    for tag, version in zip(tags, versions):
+        _tag_versions[tag] = (str(version), now)
+
+
+async def invalidate(*instances):
+    await invalidate_tags(*(tag for obj in instances for tag in model_tags(obj)))
+
+
+def _pack(payload: dict) -> bytes:
+    """Redis form of a payload: its metadata as one JSON line, then the
+    already encoded body."""
+    meta = {"v": payload["v"], "delta": payload["delta"], "exp": payload["exp"]}
+    return dumps(meta) + b"\n" + payload["body"]
+
+
+def _unpack(raw: bytes) -> Optional[dict]:
+    meta, _, body = raw.partition(b"\n")
+    try:
+        payload = loads(meta)
+        payload["body"] = body
+        return payload if body and "exp" in payload else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _should_refresh(payload: dict, now: float) -> bool:
+    """Probabilistic early expiry (XFetch): the closer to expiry and the more
+    expensive the value was to compute, the likelier a caller refreshes it."""
+    beta = settings.cache_early_refresh_beta
+    if not beta:
+        return False
+    return now - payload["delta"] * beta * math.log(random.random()) >= payload["exp"]
+
+
+class CacheEntry:
+    """One cached response, looked up in process memory, then Redis.
+
+    ``get`` returns None when the caller has to compute the value (miss,
+    stale tags or early refresh) and must then call ``set``. Concurrent misses
+    on the same key wait for the first caller instead of recomputing.
+    With ``trust_local_versions=False`` the tag versions are always read from
+    Redis, so invalidations by other workers are seen immediately.
+
+    Values are stored JSON encoded and read back as bytes (through the
+    client of ``get_bytes_redis``). With ``as_response`` hits come back as a
+    response carrying the stored bytes, so they are never decoded or encoded
+    again; otherwise they are decoded.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        ttl: int,
+        tags: Sequence[str],
+        trust_local_versions: bool = True,
+        as_response: bool = False,
+    ):
+        self.key = key
+        self.ttl = ttl
+        self.tags = list(tags)
+        self.trust_local_versions = trust_local_versions
+        self.as_response = as_response
+        self.versions = None
+        self._started = None
+        self._future = None
+        self._locked = False
+
+    def _local_versions(self) -> Optional[list]:
+        now = time.monotonic()
+        versions = []
+        for tag in self.tags:
+            known = _tag_versions.get(tag)
+            if known is None or now - known[1] > settings.cache_tag_version_ttl:
+                return None
+            versions.append(known[0])
+        return versions
+
+    def _valid(self, payload: dict) -> bool:
+        return payload["v"] == self.versions and payload["exp"] > time.time()
+
+    async def get(self):
+        self._started = time.monotonic()
+        self.versions = self._local_versions() if self.trust_local_versions else None
+
+        entry = local_cache.get(self.key, time.time())
+        if self.versions is not None and entry and self._valid(entry["payload"]):
+            stats["local_hits"] += 1
+            return self._serve(entry["payload"])
+
+        try:
+            redis = await get_bytes_redis()
+            pipe = redis.pipeline(transaction=False)
+            pipe.get(self.key)
+            if self.tags:
+                pipe.mget([TAG_PREFIX + tag for tag in self.tags])
+            raw, *versions = await pipe.execute()
+        except RedisError:
+            stats["errors"] += 1
+            self.versions = self.versions or []
+            return None
+
+        self.versions = [
+            None if v is None else v.decode() for v in (versions or [[]])[0]
+        ]
+        now = time.monotonic()
+        for tag, version in zip(self.tags, self.versions):
+            _tag_versions[tag] = (version, now)
+
+        if entry and self._valid(entry["payload"]):
+            stats["local_hits"] += 1
+            return self._serve(entry["payload"])
+
+        payload = _unpack(raw) if raw is not None else None
+        if payload is not None:
+            if self._valid(payload):
+                stats["redis_hits"] += 1
+                self._store_local(payload, len(raw))
+                return self._serve(payload)
+
+        stats["misses"] += 1
+        return await self._wait_or_lead(redis)
+
+    def _serve(self, payload: dict):
+        if _should_refresh(payload, time.time()) and self.key not in _inflight:
+            # this caller refreshes in the background of everyone else's hits
+            stats["early_refreshes"] += 1
+            self._future = _inflight[self.key] = (
+                asyncio.get_running_loop().create_future()
+            )
+            return None
+        return self._output(payload["body"])
+
+    def _output(self, body: bytes):
+        if self.as_response:
+            return RawJSONResponse(body)
+        return loads(body)
+
+    async def _wait_or_lead(self, redis):
+        waiting = _inflight.get(self.key)
+        if waiting is not None:
+            stats["coalesced"] += 1
+            try:
+                body = await asyncio.wait_for(
+                    asyncio.shield(waiting), settings.cache_lock_ttl
+                )
+            except asyncio.TimeoutError:
+                body = None
+            return None if body is None else self._output(body)
+
+        self._future = _inflight[self.key] = asyncio.get_running_loop().create_future()
+
+        # only one worker across the deployment computes; the others poll briefly
+        try:
+            self._locked = bool(
+                await redis.set(
+                    LOCK_PREFIX + self.key,
+                    1,
+                    nx=True,
+                    px=int(settings.cache_lock_ttl * 1000),
+                )
+            )
+            if not self._locked:
+                deadline = time.monotonic() + settings.cache_lock_wait
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                    raw = await redis.get(self.key)
+                    payload = _unpack(raw) if raw is not None else None
+                    if payload is not None and self._valid(payload):
+                        stats["coalesced"] += 1
+                        self._store_local(payload, len(raw))
+                        self._resolve(payload["body"])
+                        return self._output(payload["body"])
+        except RedisError:
+            stats["errors"] += 1
+        return None
+
+    def _store_local(self, payload: dict, size: int):
+        local_exp = min(payload["exp"], time.time() + settings.cache_local_ttl)
+        local_cache.put(
+            self.key, {"payload": payload, "size": size, "local_exp": local_exp}
+        )
+
+    def _resolve(self, body: Optional[bytes]):
+        if self._future is not None:
+            if not self._future.done():
+                self._future.set_result(body)
+            if _inflight.get(self.key) is self._future:
+                del _inflight[self.key]
+            self._future = None
+
+    async def set(self, data):
+        """Encode and store ``data``. Returns it as sent to clients: the
+        encoded response for response entries, ``data`` itself otherwise."""
+        if self.versions is None:
+            self.versions = []
+        payload = {
+            "v": self.versions,
+            "body": dumps(data),
+            "delta": time.monotonic() - (self._started or time.monotonic()),
+            "exp": time.time() + self.ttl,
+        }
+        raw = _pack(payload)
+        self._store_local(payload, len(raw))
+        self._resolve(payload["body"])
+        try:
+            redis = await get_bytes_redis()
+            pipe = redis.pipeline(transaction=False)
+            pipe.setex(self.key, self.ttl, raw)
+            if self._locked:
+                pipe.delete(LOCK_PREFIX + self.key)
+            await pipe.execute()
+            self._locked = False
+        except RedisError:
+            stats["errors"] += 1
+        return self._output(payload["body"]) if self.as_response else data
+
+    async def release(self):
+        """Wake up waiters and drop the lock if ``set`` was never reached."""
+        self._resolve(None)
+        if self._locked:
+            self._locked = False
+            try:
+                redis = await get_bytes_redis()
+                await redis.delete(LOCK_PREFIX + self.key)
+            except RedisError:
+                pass
+
+
+class ResponseCache:
+    """Response cache dependency.
+
+    ``vary`` picks what the key depends on: ``query`` (all query parameters),
+    ``user`` and ``role`` (from the bearer token claims). ``tags`` may use
+    ``{user_id}``; entries are dropped when one of their tags is bumped.
+    Hits and ``set`` give the JSON encoded response, so a handler returns
+    either as is:
+
+        cache: CacheEntry = Depends(ResponseCache(ttl=300, tags=["jobs"]))
+        ...
+        cached = await cache.get()
+        if cached is not None:
+            return cached
+        ...
+        return await cache.set(response_data)
+    """
+
+    def __init__(
+        self,
+        ttl: int = 60,
+        vary: Iterable[str] = ("query",),
+        tags: Iterable[str] = (),
+    ):
+        self.ttl = ttl
+        self.vary = tuple(vary)
+        self.tags = tuple(tags)
+
+    async def __call__(self, request: Request):
+        claims = {}
+        if (
+            "user" in self.vary
+            or "role" in self.vary
+            or any("{user_id}" in tag for tag in self.tags)
+        ):
+            claims = bearer_claims(request.headers.get("authorization")) or {}
+
+        parts = {}
+        if "query" in self.vary:
+            parts["query"] = sorted(request.query_params.multi_items())
+        if "user" in self.vary:
+            parts["user"] = claims.get("id")
+        if "role" in self.vary:
+            parts["role"] = claims.get("role")
+
+        tags = [tag.format(user_id=claims.get("id")) for tag in self.tags]
+        entry = CacheEntry(
+            make_cache_key(request.url.path, parts), self.ttl, tags, as_response=True
+        )
+        try:
+            yield entry
+        finally:
+            await entry.release()
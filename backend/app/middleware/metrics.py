@@ -0,0 +1,267 @@
+"""Prometheus metrics for the API, served at ``/metrics``.
+
+Request metrics are plain dicts updated from the event loop, so recording
+needs no locks. With several workers each one writes its snapshot to
+``metrics_dir`` every ``metrics_flush_interval`` seconds and ``/metrics``
+merges the files, whichever worker answers the scrape. Gauges (pools,
+threadpool, in-flight) come from live workers only and carry a ``pid`` label.
+"""
+
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Optional
+
+from anyio import to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+from ..db.database import async_engine, async_reader_engine, engine, reader_engine
+from .cache import cache_stats
+from .rate_limit import rejections
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (method, route) -> [bucket counts..., +Inf count, sum]
+_latency = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1) + [0.0])
+# (method, route, status) -> count
+_responses = defaultdict(int)
+_in_flight = 0
+
+
+def observe(method: str, route: str, status: int, seconds: float):
+    histogram = _latency[(method, route)]
+    histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    histogram[-1] += seconds
+    _responses[(method, route, status)] += 1
+
+
+class MetricsMiddleware:
+    """Records latency, status and in-flight requests per route template and
+    answers ``GET /metrics``."""
+
+    def __init__(self, app: ASGIApp, path: str = "/metrics"):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        global _in_flight
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if scope["path"] == self.path:
+            return await self._serve(send)
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_flight -= 1
+            # the router stores the matched route in the scope; the template
+            # keeps the label set bounded, unlike the raw path
+            route = scope.get("route")
+            observe(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - started,
+            )
+
+    async def _serve(self, send: Send):
+        body = render().encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; version=0.0.4; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def _gauges() -> dict:
+    """Point-in-time values of this worker, as ``name -> {labels: value}``."""
+    gauges = defaultdict(dict)
+    gauges["http_requests_in_flight"][()] = _in_flight
+
+    engines = {
+        "primary": engine,
+        "reader": reader_engine,
+        "async_primary": async_engine.sync_engine,
+        "async_reader": async_reader_engine.sync_engine,
+    }
+    seen = set()
+    for name, target in engines.items():
+        pool = target.pool
+        if id(pool) in seen:
+            continue
+        seen.add(id(pool))
+        for metric in ("size", "checkedout", "overflow", "checkedin"):
+            value = getattr(pool, metric, None)
+            if callable(value):
+                gauges[f"db_pool_{metric}"][(("engine", name),)] = value()
+
+    try:
+        limiter = to_thread.current_default_thread_limiter()
+        gauges["threadpool_busy_threads"][()] = limiter.borrowed_tokens
+        gauges["threadpool_max_threads"][()] = limiter.total_tokens
+    except RuntimeError:
+        pass  # no running event loop
+    return gauges
+
+
+def _counters() -> dict:
+    counters = defaultdict(dict)
+    for (method, route, status), count in _responses.items():
+        labels = (("method", method), ("route", route), ("status", str(status)))
+        counters["http_responses_total"][labels] = count
+    for policy, count in rejections.items():
+        counters["rate_limit_rejections_total"][(("policy", policy),)] = count
+    for event, count in cache_stats().items():
+        if event in ("local_entries", "local_bytes"):
+            continue
+        counters["response_cache_events_total"][(("event", event),)] = count
+    return counters
+
+
+def snapshot() -> dict:
+    """This worker's metrics in a JSON friendly form."""
+
+    def dump(metrics: dict) -> dict:
+        return {
+            name: [[list(map(list, labels)), value] for labels, value in values.items()]
+            for name, values in metrics.items()
+        }
+
+    return {
+        "time": time.time(),
+        "counters": dump(_counters()),
+        "gauges": dump(_gauges()),
+        "latency": [
+            [method, route, histogram]
+            for (method, route), histogram in _latency.items()
+        ],
+    }
+
+
+def write_snapshot():
+    if not settings.metrics_dir:
+        return
+    os.makedirs(settings.metrics_dir, exist_ok=True)
+    path = os.path.join(settings.metrics_dir, f"{os.getpid()}.json")
+    with open(path + ".tmp", "w") as handle:
+        json.dump(snapshot(), handle)
+    os.replace(path + ".tmp", path)
+
+
+def _snapshots() -> list:
+    """Snapshots of every worker, this one fresh."""
+    snapshots = [(os.getpid(), snapshot())]
+    if not settings.metrics_dir:
+        return snapshots
+    for name in os.listdir(settings.metrics_dir):
+        if not name.endswith(".json") or name == f"{os.getpid()}.json":
+            continue
+        try:
+            with open(os.path.join(settings.metrics_dir, name)) as handle:
+                snapshots.append((int(name[:-5]), json.load(handle)))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def render() -> str:
+    counters = defaultdict(lambda: defaultdict(float))
+    gauges = defaultdict(dict)
+    latency = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1) + [0.0])
+    stale_after = 3 * settings.metrics_flush_interval
+
+    for pid, data in _snapshots():
+        for name, values in data["counters"].items():
+            for labels, value in values:
+                counters[name][tuple(map(tuple, labels))] += value
+        # counters of exited workers still count, their gauges do not
+        if pid == os.getpid() or time.time() - data["time"] < stale_after:
+            for name, values in data["gauges"].items():
+                for labels, value in values:
+                    gauges[name][tuple(map(tuple, labels)) + (("pid", pid),)] = value
+        for method, route, histogram in data["latency"]:
+            merged = latency[(method, route)]
+            for i, value in enumerate(histogram):
+                merged[i] += value
+
+    lines = [
+        "# HELP http_request_duration_seconds Request latency per route template.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), histogram in sorted(latency.items()):
+        base = (("method", method), ("route", route))
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), histogram[:-1]):
+            cumulative += count
+            labels = _labels(base + (("le", str(bound)),))
+            lines.append(f"http_request_duration_seconds_bucket{labels} {cumulative}")
+        lines.append(
+            f"http_request_duration_seconds_sum{_labels(base)} {histogram[-1]}"
+        )
+        lines.append(f"http_request_duration_seconds_count{_labels(base)} {cumulative}")
+
+    for kind, metrics in (("counter", counters), ("gauge", gauges)):
+        for name in sorted(metrics):
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(metrics[name].items()):
+                value = int(value) if float(value).is_integer() else value
+                lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+_flusher: Optional[asyncio.Task] = None
+
+
+async def _flush():
+    while True:
+        await asyncio.sleep(settings.metrics_flush_interval)
+        write_snapshot()
+
+
+def start_metrics():
+    global _flusher
+    if settings.metrics_dir and _flusher is None:
+        write_snapshot()
+        _flusher = asyncio.create_task(_flush())
+
+
+async def stop_metrics():
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        try:
+            await _flusher
+        except asyncio.CancelledError:
+            pass
+    _flusher = None
+    write_snapshot()
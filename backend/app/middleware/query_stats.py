@@ -0,0 +1,148 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|%\(\w+\)s))+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape: whitespace collapsed and IN lists reduced to one
+    placeholder, so the same query with other values maps to one key."""
+    return _IN_LIST.sub("(?)", _SPACE.sub(" ", statement).strip())
+
+
+class RequestQueries:
+    """SQL issued while serving one request."""
+
+    __slots__ = ("count", "seconds", "slowest", "slowest_seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = None
+        self.slowest_seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest, self.slowest_seconds = statement, seconds
+        self.shapes[fingerprint(statement)] += 1
+
+    def suspected_n_plus_one(self) -> list:
+        """Shapes run at least ``sql_n_plus_one_threshold`` times."""
+        threshold = settings.sql_n_plus_one_threshold
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def current_queries() -> Optional[RequestQueries]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if _current.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    queries = _current.get()
+    started = getattr(context, "_query_started", None)
+    if queries is not None and started is not None:
+        queries.record(statement, time.perf_counter() - started)
+
+
+def instrument_engines(*engines):
+    """Attribute the statements of these (sync) engines to the current request.
+
+    Only called when ``sql_instrumentation`` is on; without it no listener
+    is attached and statements pay nothing.
+    """
+    for engine in set(engines):
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _server_timing(queries: RequestQueries) -> bytes:
+    return (
+        f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries", '
+        f"db-slowest;dur={queries.slowest_seconds * 1000:.1f}"
+    ).encode()
+
+
+class QueryStatsMiddleware:
+    """Per-request SQL counts, time, slowest statement and N+1 suspects.
+
+    Logs one line per request that ran SQL and, when ``debug`` is on, adds a
+    ``Server-Timing`` header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+        status = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.debug:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", _server_timing(queries))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if queries.count:
+                self._log(scope, status, queries)
+
+    def _log(self, scope: Scope, status: Optional[int], queries: RequestQueries):
+        suspects = queries.suspected_n_plus_one()
+        fields = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "queries": queries.count,
+            "db_ms": round(queries.seconds * 1000, 1),
+            "slowest_ms": round(queries.slowest_seconds * 1000, 1),
+            "slowest": fingerprint(queries.slowest or "")[:200],
+            "n_plus_one": [
+                {"count": count, "statement": shape[:200]} for shape, count in suspects
+            ],
+        }
+        line = " ".join(f"{k}={fields[k]}" for k in ("method", "path", "status"))
+        line += f" queries={fields['queries']} db_ms={fields['db_ms']}"
+        if suspects:
+            logger.bind(**fields).warning(
+                f"sql {line} suspected N+1: {len(suspects)} repeated statements"
+            )
+        else:
+            logger.bind(**fields).debug(f"sql {line}")
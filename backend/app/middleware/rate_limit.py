@@ -0,0 +1,132 @@
+import json
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+from redis.exceptions import RedisError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..core.security import bearer_claims
+from .redis import get_redis
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    limit: int
+    window: int  # seconds
+    key: str = "ip"  # "ip" or "user" (falls back to ip without a valid token)
+    methods: Optional[FrozenSet[str]] = None
+    message: str = "Too many requests. Try again later."
+
+
+# Exact request paths mapped to their policy; anything else is not limited.
+POLICIES: Dict[str, RateLimitPolicy] = {
+    "/app/api/v1/users/login": RateLimitPolicy(
+        "login",
+        limit=5,
+        window=60,
+        methods=frozenset({"POST"}),
+        message="Too many login attempts. Try again in a minute.",
+    ),
+    "/app/api/v1/jobs/search": RateLimitPolicy("search", limit=60, window=60),
+    "/app/api/v1/profiles/freelancers/search": RateLimitPolicy(
+        "freelancer_search", limit=60, window=60, key="user"
+    ),
+}
+
+# Rejected requests per policy name, exported by /metrics
+rejections = Counter()
+
+# Sliding window log kept in a sorted set: trim, count and record in one
+# atomic round trip. Returns {allowed, remaining, retry_after_ms}.
+SLIDING_WINDOW = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, 0, window - (now - tonumber(oldest[2]))}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, limit - count - 1, 0}
+"""
+
+
+def _client_ip(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _user_id(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            claims = bearer_claims(value.decode("latin-1"))
+            return claims.get("id") if claims else None
+    return None
+
+
+class RateLimitMiddleware:
+    """Pure ASGI rate limiter applying per-route policies.
+
+    Requests to paths without a policy are passed straight through, so the
+    cost on unlimited routes is a dict lookup. Redis errors fail open.
+    """
+
+    def __init__(self, app: ASGIApp, policies: Dict[str, RateLimitPolicy] = None):
+        self.app = app
+        self.policies = POLICIES if policies is None else policies
+        self._script = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        policy = self.policies.get(scope["path"])
+        if policy is None or (policy.methods and scope["method"] not in policy.methods):
+            return await self.app(scope, receive, send)
+
+        identity = None
+        if policy.key == "user":
+            identity = _user_id(scope)
+        identity = f"user:{identity}" if identity else f"ip:{_client_ip(scope)}"
+
+        try:
+            allowed, _, retry_after_ms = await self._hit(policy, identity)
+        except RedisError:
+            return await self.app(scope, receive, send)
+
+        if allowed:
+            return await self.app(scope, receive, send)
+        await self._reject(send, policy, retry_after_ms)
+
+    async def _hit(self, policy: RateLimitPolicy, identity: str):
+        redis = await get_redis()
+        if self._script is None or self._script.registered_client is not redis:
+            self._script = redis.register_script(SLIDING_WINDOW)
+        now = int(time.time() * 1000)
+        return await self._script(
+            keys=[f"rate:{policy.name}:{identity}"],
+            args=[now, policy.window * 1000, policy.limit, f"{now}:{uuid.uuid4().hex}"],
+        )
+
+    async def _reject(self, send: Send, policy: RateLimitPolicy, retry_after_ms: int):
+        rejections[policy.name] += 1
+        body = json.dumps({"detail": policy.message}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, -(-retry_after_ms // 1000))).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
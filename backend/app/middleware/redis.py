@@ -1,34 +1,84 @@
-from redis import Redis
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+import asyncio
+from typing import Optional
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
 import hashlib
 import json
 
+from ..config import settings
+
+_pool: Optional[ConnectionPool] = None
+_redis: Optional[Redis] = None
+# same server and settings, without decode_responses: values come back as the
+# stored bytes (the response cache keeps encoded JSON)
+_bytes_pool: Optional[ConnectionPool] = None
+_bytes_redis: Optional[Redis] = None
+
+
+def _connect(decode_responses: bool):
+    pool = ConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=settings.redis_max_connections,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_connect_timeout,
+        health_check_interval=settings.redis_health_check_interval,
+        decode_responses=decode_responses,
+    )
+    return pool, Redis(connection_pool=pool)
+
+
+async def init_redis() -> Redis:
+    """Create the shared clients and connection pools (called from the lifespan)."""
+    global _pool, _redis, _bytes_pool, _bytes_redis
+    if _redis is not None:
+        return _redis
+
+    if settings.redis_url.startswith("fakeredis://"):
+        from fakeredis import FakeAsyncRedis, FakeServer
+
+        server = FakeServer()
+        _redis = FakeAsyncRedis(server=server, decode_responses=True)
+        _bytes_redis = FakeAsyncRedis(server=server)
+        return _redis
+
+    _pool, _redis = _connect(decode_responses=True)
+    _bytes_pool, _bytes_redis = _connect(decode_responses=False)
+    await _warm(_redis, settings.redis_pool_warm)
+    await _warm(_bytes_redis, settings.redis_pool_warm)
+    return _redis
+
 
-redis = Redis(host="localhost", port=6379, decode_responses=True)
+async def _warm(client: Redis, connections: int):
+    # concurrent pings each check out their own connection
+    try:
+        await asyncio.gather(*(client.ping() for _ in range(connections)))
+    except RedisError as e:
+        logger.warning(f"could not warm the Redis pool: {e}")
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        ip = request.client.host
-        path = request.url.path
+async def close_redis():
+    global _pool, _redis, _bytes_pool, _bytes_redis
+    for client in (_redis, _bytes_redis):
+        if client is not None:
+            await client.aclose()
+    for pool in (_pool, _bytes_pool):
+        if pool is not None:
+            await pool.disconnect()
+    _pool = _redis = _bytes_pool = _bytes_redis = None
 
-        if path == "/app/api/v1/users/login":
-            key = f"rate:{ip}:login"
-            count = redis.get(key)
 
-            if count and int(count) >= 5:
-                raise HTTPException(
-                    status_code=429,
-                    detail="Too many login attempts. Try again in a minute.",
-                )
+async def get_redis() -> Redis:
+    """The shared asyncio client; usable as a FastAPI dependency as well."""
+    return _redis if _redis is not None else await init_redis()
 
-            pipe = redis.pipeline()
-            pipe.incr(key, 1)
-            pipe.expire(key, 60)  # 60 seconds window
-            pipe.execute()
 
-        return await call_next(request)
+async def get_bytes_redis() -> Redis:
+    """The shared client that returns values as bytes instead of str."""
+    if _bytes_redis is None:
+        await init_redis()
+    return _bytes_redis
 
 
 def make_cache_key(path: str, query_params: dict) -> str:
@@ -1,15 +1,15 @@
-import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Float, Boolean
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from ..db.database import Base
+from ..db.types import UUIDBinary, new_id
 
 
 class Job(Base):
     __tablename__ = "jobs"
 
-    id = Column(String(100), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(100), ForeignKey("user.id"), nullable=False)
+    id = Column(UUIDBinary, primary_key=True, default=new_id)
+    user_id = Column(UUIDBinary, ForeignKey("user.id"), nullable=False)
 
     title = Column(String(100), nullable=False)
     job_description = Column(Text, nullable=False)
@@ -30,3 +30,14 @@ class Job(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="jobs")
+
+    __table_args__ = (
+        # client dashboard: a client's jobs newest first, optionally by status
+        Index("ix_jobs_user_id_created_at", "user_id", "created_at"),
+        Index("ix_jobs_user_id_status_created_at", "user_id", "status", "created_at"),
+        # admin recency list and the rollup runs
+        Index("ix_jobs_created_at", "created_at"),
+        # job search: active jobs by recency or budget
+        Index("ix_jobs_is_active_created_at", "is_active", "created_at"),
+        Index("ix_jobs_is_active_budget", "is_active", "budget"),
+    )
@@ -1,14 +1,14 @@
-from sqlalchemy import Boolean, Float, String, Column, ForeignKey, Text
+from sqlalchemy import Boolean, Float, String, Column, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
-import uuid
+from app.db.types import UUIDBinary, new_id
 
 
 class Profile(Base):
     __tablename__ = "profiles"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("user.id"), unique=True, nullable=False)
+    id = Column(UUIDBinary, primary_key=True, default=new_id)
+    user_id = Column(UUIDBinary, ForeignKey("user.id"), unique=True, nullable=False)
 
     bio = Column(Text, nullable=False)
     skills = Column(String(1000), nullable=False)
@@ -19,3 +19,9 @@ class Profile(Base):
     available = Column(Boolean, default=True)
 
     user = relationship("User", back_populates="profile")
+
+    __table_args__ = (
+        # freelancer search: rate ranges, optionally only available ones
+        Index("ix_profiles_hourly_rate", "hourly_rate"),
+        Index("ix_profiles_available_hourly_rate", "available", "hourly_rate"),
+    )
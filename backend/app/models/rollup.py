@@ -0,0 +1,38 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from ..db.database import Base
+
+
+class SignupRollup(Base):
+    """Users signed up per hour or day bucket and role (app/utils/rollups.py)."""
+
+    __tablename__ = "signup_rollups"
+
+    period = Column(String(8), primary_key=True)  # "hour" or "day"
+    bucket = Column(DateTime, primary_key=True)
+    role = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class JobRollup(Base):
+    """Jobs posted per hour or day bucket, category, job_type and work_mode.
+
+    NULL dimensions are stored as "" since they are part of the primary key.
+    """
+
+    __tablename__ = "job_rollups"
+
+    period = Column(String(8), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    category = Column(String(100), primary_key=True, default="")
+    job_type = Column(String(50), primary_key=True, default="")
+    work_mode = Column(String(50), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    """Start of the oldest hour a rollup still has to (re)aggregate."""
+
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(32), primary_key=True)
+    position = Column(DateTime, nullable=False)
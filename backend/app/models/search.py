@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, String
+from ..db.database import Base
+from ..db.types import UUIDBinary
+
+
+class JobSearchTerm(Base):
+    """Posting of the job search inverted index: one row per term/field/job."""
+
+    __tablename__ = "job_search_terms"
+
+    term = Column(String(64), primary_key=True)
+    field = Column(String(16), primary_key=True)
+    job_id = Column(
+        UUIDBinary, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    weight = Column(Float, nullable=False)
+
+    __table_args__ = (Index("ix_job_search_terms_job_id", "job_id"),)
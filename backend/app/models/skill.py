@@ -0,0 +1,28 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table
+from ..db.database import Base
+from ..db.types import UUIDBinary
+
+profile_skills = Table(
+    "profile_skills",
+    Base.metadata,
+    Column(
+        "profile_id",
+        UUIDBinary,
+        ForeignKey("profiles.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "skill_id",
+        Integer,
+        ForeignKey("skills.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Index("ix_profile_skills_skill_id_profile_id", "skill_id", "profile_id"),
+)
+
+
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False, unique=True)
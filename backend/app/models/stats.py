@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from ..db.database import Base
+from ..db.types import UUIDBinary
+
+
+class ClientJobStat(Base):
+    """Job totals of one client per status/work_mode pair.
+
+    Kept up to date by the job write paths (app/crud/job.py). NULL status or
+    work_mode is stored as "" since both are part of the primary key.
+    """
+
+    __tablename__ = "client_job_stats"
+
+    user_id = Column(
+        UUIDBinary, ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    status = Column(String(50), primary_key=True, default="")
+    work_mode = Column(String(50), primary_key=True, default="")
+    job_count = Column(Integer, nullable=False, default=0)
+    active_count = Column(Integer, nullable=False, default=0)
+    total_budget = Column(Float, nullable=False, default=0.0)
@@ -1,8 +1,9 @@
-from sqlalchemy import Boolean, DateTime, String, Column
+from datetime import datetime
+from sqlalchemy import Boolean, DateTime, String, Column, Index
 from ..db.database import Base
+from ..db.types import UUIDBinary, new_id
 from sqlalchemy.orm import relationship
 
-import uuid
 from sqlalchemy.sql import func
 
 
@@ -10,9 +11,9 @@ class User(Base):
     __tablename__ = "user"
 
     id = Column(
-        String(36),
+        UUIDBinary,
         primary_key=True,
-        default=lambda: str(uuid.uuid4()),
+        default=new_id,
         unique=True,
         nullable=False,
     )
@@ -22,8 +23,11 @@ class User(Base):
     password = Column(String(255), nullable=False)
     role = Column(String(50), nullable=False)
     is_banned = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # UTC like Job.created_at; the rollups window on it by datetime.utcnow
+    created_at = Column(
+        DateTime(timezone=True), default=datetime.utcnow, server_default=func.now()
+    )
+    updated_at = Column(DateTime(timezone=True), onupdate=datetime.utcnow)
 
     profile = relationship(
         "Profile",  # string form!
@@ -37,3 +41,9 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan",
     )
+
+    __table_args__ = (
+        # admin: recent signups, and the user listing filtered by role
+        Index("ix_user_created_at", "created_at"),
+        Index("ix_user_role_name", "role", "name"),
+    )
@@ -30,10 +30,53 @@ class UpdateJob(BaseModel):
 
 
 class JobResponse(BaseModel):
+    id: str
+    user_id: str
     title: str
     job_description: str
-    location: str
-    budget: float
+    location: Optional[str] = None
+    budget: Optional[float] = None
+    is_active: Optional[bool] = None
+    job_type: Optional[str] = None
+    category: Optional[str] = None
+    status: Optional[str] = None
+    deadline: Optional[datetime] = None
+    estimated_duration: Optional[str] = None
+    work_mode: Optional[str] = None
+    visibility: Optional[str] = None
+    payment_status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class FacetCount(BaseModel):
+    value: Optional[str] = None
+    count: int
+
+
+class BudgetBucket(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+    count: int
+
+
+class JobSearchFacets(BaseModel):
+    category: Optional[List[FacetCount]] = None
+    job_type: Optional[List[FacetCount]] = None
+    work_mode: Optional[List[FacetCount]] = None
+    budget: Optional[List[BudgetBucket]] = None
+
+
+class JobSearchPage(BaseModel):
+    jobs: List[JobResponse]
+    offset: int
+    limit: int
+    total: Optional[int] = None
+    is_estimate: bool = False
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    facets: Optional[JobSearchFacets] = None
@@ -1,6 +1,10 @@
 from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..middleware.cache import invalidate
+
 
 def create_instance(db: Session, model, **data):
     try:
@@ -43,3 +47,50 @@ def delete_instance(db: Session, instance):
     except Exception as e:
         db.rollback()
         raise Exception(f"Failed to delete: {e}")
+
+
+async def create_instance_async(db: AsyncSession, model, **data):
+    try:
+        instance = model(**data)
+        db.add(instance)
+        await db.commit()
+        await db.refresh(instance)
+    except Exception as e:
+        await db.rollback()
+        raise Exception(f"Failed to create {model.__name__}: {e}")
+    await invalidate(instance)
+    return instance
+
+
+async def get_instance_or_404_async(db: AsyncSession, model, **filters):
+    result = await db.execute(select(model).filter_by(**filters).limit(1))
+    instance = result.scalars().first()
+    if not instance:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"{model.__name__} not found"
+        )
+    return instance
+
+
+async def update_instance_async(db: AsyncSession, instance, data: dict):
+    for key, value in data.items():
+        if hasattr(instance, key) and value is not None:
+            setattr(instance, key, value)
+    try:
+        await db.commit()
+        await db.refresh(instance)
+    except Exception as e:
+        await db.rollback()
+        raise Exception(f"Failed to update: {e}")
+    await invalidate(instance)
+    return instance
+
+
+async def delete_instance_async(db: AsyncSession, instance):
+    try:
+        await db.delete(instance)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise Exception(f"Failed to delete: {e}")
+    await invalidate(instance)
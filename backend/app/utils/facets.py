@@ -0,0 +1,104 @@
+from collections import Counter
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.job import Job
+
+# Job columns counted by value; "budget" is counted by bucket instead
+TERM_FACETS = {
+    "category": Job.category,
+    "job_type": Job.job_type,
+    "work_mode": Job.work_mode,
+}
+FACETS = [*TERM_FACETS, "budget"]
+
+MAX_BUDGET_BUCKETS = 20
+
+# bucket index of jobs without a budget
+NO_BUDGET = -1
+
+
+def check_buckets(edges: Sequence[float]) -> List[float]:
+    """Budget bucket edges as given, rejected unless strictly increasing."""
+    edges = list(edges)
+    if not edges or len(edges) > MAX_BUDGET_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Give between 1 and {MAX_BUDGET_BUCKETS} budget bucket edges",
+        )
+    if any(low >= high for low, high in zip(edges, edges[1:])):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Budget bucket edges must be strictly increasing",
+        )
+    return edges
+
+
+def budget_bucket(edges: Sequence[float]):
+    """Index of the bucket a job's budget falls in: 0 below the first edge,
+    ``len(edges)`` from the last one on, NO_BUDGET without a budget."""
+    return case(
+        (Job.budget.is_(None), NO_BUDGET),
+        *((Job.budget < edge, index) for index, edge in enumerate(edges)),
+        else_=len(edges),
+    )
+
+
+def _bucket_bounds(edges: Sequence[float], index: int) -> dict:
+    if index == NO_BUDGET:
+        return {"min": None, "max": None}
+    return {
+        "min": edges[index - 1] if index > 0 else None,
+        "max": edges[index] if index < len(edges) else None,
+    }
+
+
+async def facet_counts(
+    db: AsyncSession,
+    stmt,
+    facets: Sequence[str],
+    edges: Optional[Sequence[float]] = None,
+) -> dict:
+    """Counts per value of each facet over the rows of ``stmt``.
+
+    ``stmt`` is the filtered, unordered job select. All facets come from one
+    GROUP BY over their combined columns, which has at most a few hundred
+    groups, and are summed up per facet here. Term facets list the values
+    by count, NULL included; the budget facet lists every bucket in order
+    (empty ones too) and jobs without a budget last, when there are any.
+    """
+    terms = [name for name in TERM_FACETS if name in facets]
+    names = terms + (["budget"] if "budget" in facets else [])
+    columns = [TERM_FACETS[name] for name in terms]
+    if "budget" in facets:
+        columns.append(budget_bucket(edges))
+    grouped = (
+        stmt.with_only_columns(*columns, func.count()).group_by(*columns).order_by(None)
+    )
+
+    counters = {name: Counter() for name in names}
+    for *values, total in (await db.execute(grouped)).all():
+        for name, value in zip(names, values):
+            counters[name][value] += total
+
+    result = {}
+    for name in terms:
+        result[name] = [
+            {"value": value, "count": total}
+            for value, total in sorted(
+                counters[name].items(), key=lambda item: (-item[1], item[0] or "")
+            )
+        ]
+    if "budget" in facets:
+        buckets = counters["budget"]
+        indexes = list(range(len(edges) + 1))
+        if buckets[NO_BUDGET]:
+            indexes.append(NO_BUDGET)
+        result["budget"] = [
+            {**_bucket_bounds(edges, index), "count": buckets[index]}
+            for index in indexes
+        ]
+    return result
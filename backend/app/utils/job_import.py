@@ -0,0 +1,257 @@
+"""Bulk job import from a streamed NDJSON or CSV request body.
+
+The body is read chunk by chunk and split into records as it arrives; each
+record is validated against ``CreateJob`` and valid ones are inserted
+``import_batch_size`` at a time with one executemany per table, one
+transaction per batch. Invalid rows are reported and skipped. Memory stays
+bounded by the batch size, ``import_max_errors`` and
+``import_max_record_chars`` whatever the body size: a line or CSV record
+longer than that is reported and skipped rather than buffered.
+
+Bulk inserts bypass the ORM unit of work, so the ``after_flush`` listeners
+that maintain the search index and client_job_stats do not run; a batch
+does that work itself.
+"""
+
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..crud.job import add_job, apply_job_stats, new_deltas
+from ..db.types import new_id
+from ..models.job import Job
+from ..schemas.job import CreateJob
+from .search import index_jobs
+
+IMPORT_FORMATS = ["ndjson", "csv"]
+
+# fields that must be present even though they may be null (e.g. budget)
+_REQUIRED = {
+    name for name, field in CreateJob.model_fields.items() if field.is_required()
+}
+
+
+def _too_long() -> str:
+    return f"Record longer than {settings.import_max_record_chars} characters"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """Decoded lines of a byte stream, line endings kept.
+
+    A line longer than ``import_max_record_chars`` comes back as None, and
+    only as much of it is held as one chunk: the rest is dropped up to the
+    next newline.
+    """
+    limit = settings.import_max_record_chars
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    skipping = False
+    async for chunk in chunks:
+        # the last piece may be the start of a line still in flight
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            if skipping:
+                # the end of a line already reported
+                skipping = False
+                continue
+            yield line + "\n" if len(line) <= limit else None
+        if len(pending) > limit:
+            if not skipping:
+                yield None
+            pending, skipping = "", True
+    pending += decoder.decode(b"", final=True)
+    if pending and not skipping:
+        yield pending if len(pending) <= limit else None
+
+
+async def ndjson_records(
+    lines: AsyncIterator[Optional[str]],
+) -> AsyncIterator[Tuple[int, dict]]:
+    """``(line number, object)`` per non-blank line; a line that is not a JSON
+    object, or is too long, comes back as ``(line number, error message)``."""
+    number = 0
+    async for line in lines:
+        number += 1
+        if line is None:
+            yield number, _too_long()
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield number, "Expected a JSON object"
+            continue
+        yield number, record
+
+
+async def csv_records(
+    lines: AsyncIterator[Optional[str]],
+) -> AsyncIterator[Tuple[int, dict]]:
+    """``(line number, row)`` per CSV record, keyed by the header row.
+
+    Quoted fields may span lines: a record is complete once its quotes are
+    balanced. A record longer than ``import_max_record_chars`` (say after a
+    stray quote) is reported and dropped, and the line that overflowed it
+    starts the next record. Empty cells are null for required fields and left out for the
+    others, so those fall back to their defaults.
+    """
+    header = None
+    number = start = 0
+    record = ""
+    async for line in lines:
+        number += 1
+        if record and (
+            line is None or len(record) + len(line) > settings.import_max_record_chars
+        ):
+            # the record so far is dropped; this line starts afresh
+            yield start, _too_long()
+            record = ""
+        if line is None:
+            yield number, _too_long()
+            continue
+        if not record:
+            start = number
+        record += line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) > len(header):
+            yield start, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, {
+            name: value or None
+            for name, value in zip(header, values)
+            if value or name in _REQUIRED
+        }
+    if record:
+        yield start, "Unterminated quoted field"
+
+
+def _error(row: int, error) -> dict:
+    if isinstance(error, ValidationError):
+        return {
+            "row": row,
+            "errors": [
+                {"field": ".".join(map(str, e["loc"])), "message": e["msg"]}
+                for e in error.errors()
+            ],
+        }
+    return {"row": row, "errors": [{"field": None, "message": error}]}
+
+
+def insert_jobs(connection, rows: list):
+    """Insert complete job rows (``id`` and ``user_id`` included) with their
+    search index entries and client_job_stats deltas."""
+    connection.execute(insert(Job), rows)
+    index_jobs(connection, rows)
+    deltas = new_deltas()
+    for row in rows:
+        add_job(deltas, row)
+    apply_job_stats(connection, deltas)
+
+
+class JobImport:
+    """Running totals of one import."""
+
+    def __init__(self, db: AsyncSession, user_id: str):
+        self.db = db
+        self.user_id = user_id
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.batch = []
+        self.batch_rows = []
+
+    def fail(self, row: int, error):
+        self.failed += 1
+        if len(self.errors) < settings.import_max_errors:
+            self.errors.append(_error(row, error))
+
+    async def add(self, row: int, record):
+        if isinstance(record, str):
+            return self.fail(row, record)
+        try:
+            job = CreateJob(**record)
+        except ValidationError as e:
+            return self.fail(row, e)
+
+        now = datetime.utcnow()
+        self.batch.append(
+            {
+                **job.dict(),
+                "id": new_id(),
+                "user_id": self.user_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        self.batch_rows.append(row)
+        if len(self.batch) >= settings.import_batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.batch:
+            return
+        rows, numbers = self.batch, self.batch_rows
+        self.batch, self.batch_rows = [], []
+        try:
+            await self.db.run_sync(lambda db: insert_jobs(db.connection(), rows))
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            for number in numbers:
+                self.fail(number, f"Batch failed: {e}")
+            return
+        self.imported += len(rows)
+
+    def report(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def import_jobs(
+    db: AsyncSession, user_id: str, chunks: AsyncIterator[bytes], format: str
+) -> dict:
+    """Import the jobs of a streamed body for ``user_id``; returns the report."""
+    records = ndjson_records if format == "ndjson" else csv_records
+    job_import = JobImport(db, user_id)
+    async for row, record in records(iter_lines(chunks)):
+        await job_import.add(row, record)
+    await job_import.flush()
+    return job_import.report()
+
+
+def import_format(content_type: Optional[str]) -> Optional[str]:
+    """Import format implied by a Content-Type header, if any."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if media_type in (
+        "application/x-ndjson",
+        "application/ndjson",
+        "application/jsonl",
+        "application/json-lines",
+    ):
+        return "ndjson"
+    return None
@@ -0,0 +1,256 @@
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy import and_, false, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..middleware.redis import get_redis
+
+# (name, column, descending); the last key must be unique, e.g. the primary key
+SortKey = Tuple[str, Any, bool]
+
+# How list endpoints report their total:
+#   exact       COUNT(*) OVER() in the page query itself
+#   approximate a count cached in Redis per filter set (``is_estimate``)
+#   has_more    no total; one extra row tells whether another page exists
+TOTALS_MODES = ["exact", "approximate", "has_more"]
+COUNT_PREFIX = "cache:count:"
+
+
+def order_clauses(keys: Sequence[SortKey]) -> list:
+    return [
+        column.desc() if descending else column.asc() for _, column, descending in keys
+    ]
+
+
+def encode_cursor(keys: Sequence[SortKey], values: Sequence, direction: str) -> str:
+    payload = {
+        "k": [name for name, _, _ in keys],
+        "v": [_dump_value(value) for value in values],
+        "d": direction,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[SortKey]) -> Tuple[list, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_load_value(value) for value in payload["v"]]
+        direction = payload["d"]
+        names = payload["k"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    if names != [name for name, _, _ in keys] or direction not in ("next", "prev"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested sort order",
+        )
+    return values, direction
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        return date.fromisoformat(value["d"])
+    return value
+
+
+def _items(rows, width: int) -> list:
+    """Page items without the sort and count columns added for paging: the
+    entity or value for single-entity selects, dicts for column selects."""
+    if width == 1:
+        return [row[0] for row in rows]
+    return [dict(zip(row._fields[:width], row[:width])) for row in rows]
+
+
+def _after(column, value, descending: bool):
+    """Rows strictly after ``value`` in the given direction, NULLs sorting lowest
+    like MySQL and SQLite do."""
+    if value is None:
+        return false() if descending else column.isnot(None)
+    if descending:
+        return or_(column < value, column.is_(None))
+    return column > value
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def keyset_filter(keys: Sequence[SortKey], values: Sequence, reverse: bool = False):
+    """Lexicographic ``(k1, k2, ..., id) > cursor`` predicate over the sort keys."""
+    branches = []
+    for i, (_, column, descending) in enumerate(keys):
+        prefix = [_equal(keys[j][1], values[j]) for j in range(i)]
+        branches.append(and_(*prefix, _after(column, values[i], descending != reverse)))
+    return or_(*branches)
+
+
+async def paginate_keyset(
+    db: AsyncSession,
+    stmt,
+    keys: Sequence[SortKey],
+    limit: int,
+    cursor: Optional[str] = None,
+) -> dict:
+    """Fetch one page of ``stmt`` by seeking past the cursor instead of OFFSET.
+
+    ``stmt`` is an unordered select of a single ORM entity or of columns (see
+    app/utils/projection.py), whose items are then dicts. Returns the items
+    and opaque ``next_cursor``/``prev_cursor`` values (None at either end).
+    """
+    width = len(stmt.column_descriptions)
+    reverse = False
+    if cursor:
+        values, direction = decode_cursor(cursor, keys)
+        reverse = direction == "prev"
+        stmt = stmt.where(keyset_filter(keys, values, reverse))
+
+    page_keys = [
+        (name, column, descending != reverse) for name, column, descending in keys
+    ]
+    # labelled, a column select that already has the key keeps both copies
+    stmt = stmt.add_columns(
+        *(column.label(f"key_{i}") for i, (_, column, _) in enumerate(keys))
+    )
+    rows = (
+        await db.execute(stmt.order_by(*order_clauses(page_keys)).limit(limit + 1))
+    ).all()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if reverse:
+        rows.reverse()
+
+    items: List = _items(rows, width)
+    first = rows[0][width:] if rows else None
+    last = rows[-1][width:] if rows else None
+
+    # going forward there is a previous page whenever we started from a cursor,
+    # going backward there is a next page by construction
+    has_next = more if not reverse else True
+    has_prev = bool(cursor) if not reverse else more
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(keys, last, "next") if has_next and last else None,
+        "prev_cursor": (
+            encode_cursor(keys, first, "prev") if has_prev and first else None
+        ),
+    }
+
+
+async def count_rows(db: AsyncSession, stmt) -> int:
+    return await db.scalar(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    )
+
+
+def _count_key(stmt) -> str:
+    compiled = stmt.compile()
+    raw = f"{compiled}|{sorted(compiled.params.items())!r}"
+    return COUNT_PREFIX + hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def approximate_count(db: AsyncSession, stmt) -> Tuple[int, bool]:
+    """Count of ``stmt`` cached for ``approx_count_ttl`` seconds.
+
+    Returns the count and whether it came from the cache, i.e. may be stale.
+    """
+    key = _count_key(stmt)
+    redis = None
+    try:
+        redis = await get_redis()
+        cached = await redis.get(key)
+        if cached is not None:
+            return int(cached), True
+    except RedisError:
+        redis = None
+
+    total = await count_rows(db, stmt)
+    if redis is not None:
+        try:
+            await redis.set(key, total, ex=settings.approx_count_ttl)
+        except RedisError:
+            pass
+    return total, False
+
+
+async def count_total(db: AsyncSession, stmt, totals: str = "exact") -> dict:
+    """``total`` and ``is_estimate`` for pages that cannot carry a window count
+    (keyset pages only see the rows past the cursor)."""
+    if totals == "has_more":
+        return {"total": None, "is_estimate": False}
+    if totals == "approximate":
+        total, is_estimate = await approximate_count(db, stmt)
+        return {"total": total, "is_estimate": is_estimate}
+    return {"total": await count_rows(db, stmt), "is_estimate": False}
+
+
+async def paginate_offset(
+    db: AsyncSession,
+    stmt,
+    keys: Sequence[SortKey],
+    limit: int,
+    offset: int = 0,
+    totals: str = "exact",
+) -> dict:
+    """Fetch one OFFSET page of ``stmt`` together with its total.
+
+    ``stmt`` is an unordered select of a single ORM entity or of columns,
+    whose items are then dicts. Returns the items, ``total`` (None in has_more
+    mode), ``is_estimate`` and ``has_more``; only a page past the end or a
+    cold approximate count costs a second query.
+    """
+    ordered = stmt.order_by(*order_clauses(keys)).offset(offset)
+    if totals == "exact":
+        rows = (
+            await db.execute(ordered.add_columns(func.count().over()).limit(limit))
+        ).all()
+        items = _items(rows, len(stmt.column_descriptions))
+        if rows:
+            total = rows[0][-1]
+        else:
+            total = await count_rows(db, stmt) if offset else 0
+        return {
+            "items": items,
+            "total": total,
+            "is_estimate": False,
+            "has_more": offset + len(items) < total,
+        }
+
+    rows = (await db.execute(ordered.limit(limit + 1))).all()
+    items = _items(rows, len(stmt.column_descriptions))
+    has_more = len(items) > limit
+    items = items[:limit]
+    total, is_estimate = None, False
+    if totals == "approximate":
+        if not has_more and (items or not offset):
+            # the last page gives the exact total for free
+            total = offset + len(items)
+        else:
+            total, is_estimate = await approximate_count(db, stmt)
+    return {
+        "items": items,
+        "total": total,
+        "is_estimate": is_estimate,
+        "has_more": has_more,
+    }
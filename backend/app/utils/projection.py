@@ -0,0 +1,65 @@
+"""Fields a list endpoint outputs, declared once and turned into a query shape.
+
+A ``Projection`` names the columns of a model, and of its relationships,
+that an endpoint actually puts in its response. ``select()`` builds a Core
+select of just those columns: rows come back as plain tuples, with no
+identity map or instance state. ``options()`` gives the loader options for
+endpoints that need ORM objects: ``load_only`` for the columns plus a
+``joinedload``/``selectinload`` (or ``contains_eager`` when the statement
+already joins it) per relationship. Attributes left out raise instead of
+lazy loading one row at a time.
+"""
+
+from typing import Iterable
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import contains_eager, joinedload, load_only, selectinload
+
+
+class Projection:
+    def __init__(self, model, *fields: str, **related: "Projection"):
+        self.model = model
+        self.fields = fields
+        self.related = related
+
+    def columns(self, prefix: str = "") -> list:
+        """The projected columns, related ones labelled ``<relationship>_<field>``."""
+        columns = [
+            (
+                getattr(self.model, field).label(prefix + field)
+                if prefix
+                else getattr(self.model, field)
+            )
+            for field in self.fields
+        ]
+        for name, projection in self.related.items():
+            columns += projection.columns(f"{prefix}{name}_")
+        return columns
+
+    def select(self):
+        """Core select of the columns. Relationships are not joined: the
+        caller adds the joins the related columns need."""
+        return select(*self.columns()).select_from(self.model)
+
+    def options(self, joined: Iterable[str] = ()) -> list:
+        """Loader options for ``select(model)``.
+
+        ``joined`` names the relationships the statement already joins; they
+        are populated from that join instead of a second one.
+        """
+        options = [
+            load_only(
+                *(getattr(self.model, field) for field in self.fields), raiseload=True
+            )
+        ]
+        relationships = inspect(self.model).relationships
+        for name, projection in self.related.items():
+            attribute = getattr(self.model, name)
+            if name in joined:
+                loader = contains_eager(attribute)
+            elif relationships[name].uselist:
+                loader = selectinload(attribute)
+            else:
+                loader = joinedload(attribute)
+            options.append(loader.options(*projection.options()))
+        return options
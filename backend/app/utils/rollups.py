@@ -0,0 +1,247 @@
+"""Hourly and daily rollups of signups and job postings for the admin dashboard.
+
+Each rollup re-aggregates the hours from its watermark up to ``now - lag``
+with one GROUP BY on ``created_at`` and replaces those hour buckets; the day
+buckets touched are then summed from the hour buckets. The last, partial hour
+is recomputed on the next run, so a run only ever reads the rows created
+since the previous one. Rollups count signups and postings: deleted users
+and jobs stay counted in the hour they were created, under the role or
+category they had then. Current totals are counted from the tables.
+
+``created_at`` is UTC on both models and so are the buckets and the
+``now`` a run rolls up to.
+"""
+
+import asyncio
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy import DateTime, delete, func, insert, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from ..config import settings
+from ..db.database import sessionLocal
+from ..middleware.cache import invalidate_tags
+from ..middleware.redis import get_redis
+from ..models.job import Job
+from ..models.rollup import JobRollup, RollupWatermark, SignupRollup
+from ..models.user import User
+
+# cache tag of the responses built from the rollup tables
+ROLLUPS_TAG = "rollups"
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+# name: (source model, dimension columns, fact model)
+ROLLUPS = {
+    "signups": (User, ("role",), SignupRollup),
+    "jobs": (Job, ("category", "job_type", "work_mode"), JobRollup),
+}
+
+
+class hour_floor(FunctionElement):
+    """``created_at`` truncated to the hour, per dialect."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(hour_floor)
+def _hour_floor_default(element, compiler, **kw):
+    return "date_trunc('hour', %s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(hour_floor, "mysql")
+def _hour_floor_mysql(element, compiler, **kw):
+    return "DATE_FORMAT(%s, '%%%%Y-%%%%m-%%%%d %%%%H:00:00')" % compiler.process(
+        element.clauses, **kw
+    )
+
+
+@compiles(hour_floor, "sqlite")
+def _hour_floor_sqlite(element, compiler, **kw):
+    return "strftime('%%Y-%%m-%%d %%H:00:00', %s)" % compiler.process(
+        element.clauses, **kw
+    )
+
+
+def floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _as_datetime(value) -> datetime:
+    # MySQL and SQLite hand the truncated value back as a string
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    return value.replace(tzinfo=None)
+
+
+def _watermark(db, name: str, source) -> Optional[datetime]:
+    position = db.scalar(
+        select(RollupWatermark.position).where(RollupWatermark.name == name)
+    )
+    if position is None:
+        oldest = db.scalar(select(func.min(source.created_at)))
+        position = floor_hour(_as_datetime(oldest)) if oldest else None
+    return position
+
+
+def _roll_hours(db, name: str, start: datetime, end: datetime):
+    source, dimensions, fact = ROLLUPS[name]
+    bucket = hour_floor(source.created_at)
+    columns = [func.coalesce(getattr(source, d), "") for d in dimensions]
+    rows = db.execute(
+        select(bucket, *columns, func.count())
+        .where(source.created_at >= start, source.created_at < end)
+        .group_by(bucket, *columns)
+    ).all()
+
+    db.execute(
+        delete(fact).where(
+            fact.period == "hour", fact.bucket >= start, fact.bucket < end
+        )
+    )
+    if rows:
+        db.execute(
+            insert(fact),
+            [
+                dict(
+                    zip(dimensions, row[1:-1]),
+                    period="hour",
+                    bucket=_as_datetime(row[0]),
+                    count=row[-1],
+                )
+                for row in rows
+            ],
+        )
+
+
+def _roll_days(db, name: str, start: datetime, end: datetime):
+    """Rebuild the day buckets from ``start``'s day through ``end``'s day."""
+    _, dimensions, fact = ROLLUPS[name]
+    first, last = floor_day(start), floor_day(end) + DAY
+    hours = db.execute(
+        select(fact.bucket, *(getattr(fact, d) for d in dimensions), fact.count).where(
+            fact.period == "hour", fact.bucket >= first, fact.bucket < last
+        )
+    ).all()
+    days = Counter()
+    for bucket, *values, count in hours:
+        days[(floor_day(bucket), *values)] += count
+
+    db.execute(
+        delete(fact).where(
+            fact.period == "day", fact.bucket >= first, fact.bucket < last
+        )
+    )
+    if days:
+        db.execute(
+            insert(fact),
+            [
+                dict(zip(dimensions, key[1:]), period="day", bucket=key[0], count=count)
+                for key, count in days.items()
+            ],
+        )
+
+
+def run_rollup(name: str, now: Optional[datetime] = None) -> int:
+    """Bring one rollup up to ``now - rollup_lag``; returns the hours rolled."""
+    source = ROLLUPS[name][0]
+    end = (now or datetime.utcnow()) - timedelta(seconds=settings.rollup_lag)
+    step = settings.rollup_batch_hours * HOUR
+    rolled = 0
+    with sessionLocal() as db:
+        start = _watermark(db, name, source)
+        while start is not None and start < end:
+            stop = min(start + step, end)
+            _roll_hours(db, name, start, stop)
+            _roll_days(db, name, start, stop)
+            # the hour ``stop`` falls in is incomplete unless on the boundary
+            position = floor_hour(stop)
+            db.merge(RollupWatermark(name=name, position=position))
+            db.commit()
+            rolled += math.ceil((stop - start) / HOUR)
+            if stop == end:
+                break
+            start = position
+    return rolled
+
+
+def run_rollups(now: Optional[datetime] = None) -> dict:
+    return {name: run_rollup(name, now) for name in ROLLUPS}
+
+
+def rollup_window(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[str, Optional[datetime], Optional[datetime]]:
+    """Bucket period and bounds to answer ``[start, end)`` from.
+
+    Day buckets when the bounds fall on midnight, hour buckets otherwise.
+    """
+    start = start.replace(tzinfo=None) if start else None
+    end = end.replace(tzinfo=None) if end else None
+    if all(value is None or value == floor_day(value) for value in (start, end)):
+        return "day", start, end
+    return "hour", start and floor_hour(start), end
+
+
+def rollup_filter(fact, start: Optional[datetime], end: Optional[datetime]) -> list:
+    period, start, end = rollup_window(start, end)
+    clauses = [fact.period == period]
+    if start is not None:
+        clauses.append(fact.bucket >= start)
+    if end is not None:
+        clauses.append(fact.bucket < end)
+    return clauses
+
+
+_scheduler: Optional[asyncio.Task] = None
+
+
+async def _schedule():
+    while True:
+        await asyncio.sleep(settings.rollup_interval)
+        try:
+            redis = await get_redis()
+            # one worker per interval; the others skip this round
+            if not await redis.set(
+                "rollups:lock", "1", nx=True, ex=settings.rollup_interval
+            ):
+                continue
+        except RedisError:
+            pass  # the rollups are idempotent, running twice is harmless
+        try:
+            rolled = await run_in_threadpool(run_rollups)
+        except Exception:
+            logger.exception("rollup run failed")
+            continue
+        if any(rolled.values()):
+            await invalidate_tags(ROLLUPS_TAG)
+
+
+def start_rollup_scheduler():
+    global _scheduler
+    if settings.rollup_interval > 0 and _scheduler is None:
+        _scheduler = asyncio.create_task(_schedule())
+
+
+async def stop_rollup_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.cancel()
+        try:
+            await _scheduler
+        except asyncio.CancelledError:
+            pass
+    _scheduler = None
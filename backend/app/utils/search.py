@@ -0,0 +1,122 @@
+import re
+from collections import Counter
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session, attributes
+
+from ..models.job import Job
+from ..models.search import JobSearchTerm
+
+# Indexed job columns and how much a hit in each counts towards the score
+INDEXED_FIELDS = {
+    "title": ("title", 3.0),
+    "description": ("job_description", 1.0),
+    "category": ("category", 2.0),
+    "location": ("location", 1.0),
+}
+
+MAX_TERM_LENGTH = 64
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in is it of on or that the to with".split()
+)
+
+_TOKEN_RE = re.compile(r"[\w+#]+")
+
+
+def tokenize(text: Optional[str]) -> list:
+    """Lowercased search terms of ``text`` without stop words."""
+    if not text:
+        return []
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in _TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def job_postings(job_id: str, values: dict) -> list:
+    """Index rows for one job given its column values."""
+    rows = []
+    for field, (column, field_weight) in INDEXED_FIELDS.items():
+        for term, tf in Counter(tokenize(values.get(column))).items():
+            rows.append(
+                {
+                    "term": term,
+                    "field": field,
+                    "job_id": job_id,
+                    "weight": field_weight * tf,
+                }
+            )
+    return rows
+
+
+def index_jobs(connection, jobs: Iterable[dict]):
+    """(Re)index jobs given as dicts of column values, including ``id``."""
+    jobs = list(jobs)
+    if not jobs:
+        return
+    unindex_jobs(connection, [job["id"] for job in jobs])
+    rows = [row for job in jobs for row in job_postings(job["id"], job)]
+    if rows:
+        connection.execute(insert(JobSearchTerm), rows)
+
+
+def unindex_jobs(connection, job_ids: Sequence[str]):
+    connection.execute(delete(JobSearchTerm).where(JobSearchTerm.job_id.in_(job_ids)))
+
+
+def match_jobs(
+    terms: Sequence[str],
+    fields: Optional[Sequence[str]] = None,
+    match_all: bool = True,
+):
+    """Subquery of ``(job_id, score)`` for jobs containing the given terms.
+
+    With ``match_all`` every term has to be present (AND), otherwise any of
+    them is enough (OR). The score is the sum of the field-weighted term
+    frequencies of the matched terms.
+    """
+    terms = sorted(set(terms))
+    stmt = select(
+        JobSearchTerm.job_id, func.sum(JobSearchTerm.weight).label("score")
+    ).where(JobSearchTerm.term.in_(terms))
+    if fields:
+        stmt = stmt.where(JobSearchTerm.field.in_(fields))
+    stmt = stmt.group_by(JobSearchTerm.job_id)
+    if match_all and len(terms) > 1:
+        stmt = stmt.having(func.count(func.distinct(JobSearchTerm.term)) == len(terms))
+    return stmt.subquery()
+
+
+def _indexed_values(job: Job) -> dict:
+    values = {column: getattr(job, column) for column, _ in INDEXED_FIELDS.values()}
+    values["id"] = job.id
+    return values
+
+
+def _needs_reindex(job: Job) -> bool:
+    state = attributes.instance_state(job)
+    return any(
+        state.attrs[column].history.has_changes()
+        for column, _ in INDEXED_FIELDS.values()
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_job_index(session, flush_context):
+    """Keep the index in step with job writes, inside the same transaction."""
+    changed = [
+        _indexed_values(obj)
+        for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Job) and (obj in session.new or _needs_reindex(obj))
+    ]
+    removed = [obj.id for obj in session.deleted if isinstance(obj, Job)]
+    if not changed and not removed:
+        return
+
+    connection = session.connection()
+    if removed:
+        unindex_jobs(connection, removed)
+    index_jobs(connection, changed)
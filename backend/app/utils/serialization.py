@@ -0,0 +1,37 @@
+"""JSON encoding for responses and cached payloads.
+
+Everything is encoded with orjson, which handles datetimes, dates and UUIDs
+natively; the cache keeps the encoded bytes so a hit is sent as-is.
+"""
+
+from collections.abc import Mapping
+from decimal import Decimal
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Mapping):
+        # e.g. SQLAlchemy RowMapping
+        return dict(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(data) -> bytes:
+    return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def loads(raw):
+    return orjson.loads(raw)
+
+
+class RawJSONResponse(Response):
+    """A body that already is JSON, sent without being encoded again."""
+
+    media_type = "application/json"
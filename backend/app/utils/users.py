@@ -2,8 +2,9 @@ from fastapi import status, HTTPException
 from uuid import UUID
 
 from app.utils.exceptions import raise_forbidden
+from ..core.security import Principal
 from ..models.user import User
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 def validate_uuid(id: str) -> UUID:
@@ -13,8 +14,9 @@ def validate_uuid(id: str) -> UUID:
         raise HTTPException(status_code=400, detail="Invalid UUID format")
 
 
-def get_user_by_id(user: User, db: Session) -> User:
-    db_user = db.query(User).filter(User.id == user.id).first()
+async def get_user_by_id(user: Principal, db: AsyncSession) -> User:
+    """Load the ``User`` row behind a principal, for handlers that write to it."""
+    db_user = await db.get(User, user.id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User Not Found")
     return db_user
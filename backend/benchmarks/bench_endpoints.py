@@ -0,0 +1,90 @@
+"""Per-endpoint latency on a seeded database, one request at a time.
+
+Each scenario (benchmarks/scenarios.py) is warmed up and then requested
+``-n`` times in sequence against the app served in-process, so the numbers
+are handler, query and serialization cost without network or contention.
+Results can be saved as JSON and compared with benchmarks.compare.
+
+    python -m benchmarks.seed --reset --users 2000 --jobs 200000
+    python -m benchmarks.bench_endpoints -n 200 --out before.json
+    python -m benchmarks.bench_endpoints -n 200 --out after.json
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from . import results
+from .scenarios import SCENARIOS, client, request_args, select_scenarios, tokens
+
+
+async def bench(scenario, http, auth, args) -> dict:
+    rng = random.Random(args.seed)
+    for _ in range(args.warmup):
+        await http.get(scenario.path, **request_args(scenario, rng, auth, args.cache))
+
+    latencies, statuses = [], Counter()
+    for _ in range(args.n):
+        request = request_args(scenario, rng, auth, args.cache)
+        started = time.perf_counter()
+        response = await http.get(scenario.path, **request)
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+    return results.summarize(latencies, statuses)
+
+
+async def run(args) -> dict:
+    summaries = {}
+    async with client(args.url, args.rate_limit, timeout=60) as http:
+        auth = await tokens()
+        for scenario in select_scenarios(args.scenario):
+            summaries[scenario.name] = await bench(scenario, http, auth, args)
+            print(
+                f"{scenario.name:<24} p50 {summaries[scenario.name]['p50_ms']:>9} ms"
+                f"  p95 {summaries[scenario.name]['p95_ms']:>9} ms"
+            )
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        help=f"repeatable; default all of {', '.join(s.name for s in SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--cache", action="store_true", help="let repeated requests hit the cache"
+    )
+    parser.add_argument(
+        "--rate-limit", action="store_true", help="keep the rate limiter on"
+    )
+    parser.add_argument(
+        "--url", help="benchmark a running server instead (same database)"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    summaries = asyncio.run(run(args))
+    print()
+    results.print_table(summaries)
+    if args.out:
+        params = {
+            "n": args.n,
+            "warmup": args.warmup,
+            "cache": args.cache,
+            "rate_limit": args.rate_limit,
+            "url": args.url,
+            "seed": args.seed,
+        }
+        results.save(args.out, "endpoints", params, summaries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Per-request overhead of the rate limiting middleware.
+
+Calls a trivial ASGI app directly (no server, no sockets) through:
+
+* no middleware (baseline)
+* a pass-through BaseHTTPMiddleware, the shape of the previous limiter
+* RateLimitMiddleware on a path without a policy (fast path)
+* RateLimitMiddleware on a limited path, against the configured Redis
+
+    REDIS_URL=fakeredis:// python -m benchmarks.bench_rate_limit -n 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.rate_limit import RateLimitMiddleware, RateLimitPolicy
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+class PassThrough(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+def _scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+async def _time(app, path: str, n: int) -> float:
+    scope = _scope(path)
+    for _ in range(min(n, 100)):  # warm up
+        await app(dict(scope), _receive, _send)
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), _receive, _send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def run(n: int):
+    limited = {"/limited": RateLimitPolicy("bench", limit=10**9, window=60)}
+    cases = [
+        ("no middleware", endpoint, "/open"),
+        ("BaseHTTPMiddleware pass-through", PassThrough(endpoint), "/open"),
+        (
+            "RateLimitMiddleware, no policy",
+            RateLimitMiddleware(endpoint, limited),
+            "/open",
+        ),
+        (
+            "RateLimitMiddleware, limited",
+            RateLimitMiddleware(endpoint, limited),
+            "/limited",
+        ),
+    ]
+    baseline = None
+    for name, app, path in cases:
+        per_request = await _time(app, path, n)
+        baseline = per_request if baseline is None else baseline
+        print(f"{name:<34} {per_request:8.1f} us/req  (+{per_request - baseline:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20000, help="requests per case")
+    args = parser.parse_args()
+    asyncio.run(run(args.n))
+
+
+if __name__ == "__main__":
+    main()
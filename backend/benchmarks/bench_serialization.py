@@ -0,0 +1,123 @@
+"""Serialization cost of a 100-row job search page, per cache miss and hit.
+
+No server and no database: the page is built from in-memory rows and encoded
+the way each path does it.
+
+* stdlib     ORM objects through jsonable_encoder and json.dumps for the
+             cache, the same again for the response; a hit decodes the cached
+             JSON and FastAPI encodes it once more (the previous path)
+* pydantic   rows validated into JobSearchPage and dumped with model_dump_json
+* orjson     plain rows encoded once by app.utils.serialization; a hit sends
+             the cached bytes (only the Redis copy is unpacked)
+
+    python -m benchmarks.bench_serialization -n 2000
+"""
+
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from app.middleware.cache import _pack, _unpack
+from app.models.job import Job
+from app.schemas.job import JobSearchPage
+from app.utils.serialization import dumps
+
+ROWS = 100
+
+
+def _rows() -> list:
+    now = datetime(2025, 1, 1)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": str(uuid.uuid4()),
+            "title": f"Senior Python developer {i}",
+            "job_description": "Build and maintain FastAPI services. " * 8,
+            "location": "Tunis",
+            "budget": 1000.0 + i,
+            "is_active": True,
+            "job_type": "fixed",
+            "category": "development",
+            "status": "open",
+            "deadline": now + timedelta(days=30),
+            "estimated_duration": "3 months",
+            "work_mode": "remote",
+            "visibility": "public",
+            "payment_status": "pending",
+            "created_at": now - timedelta(hours=i),
+            "updated_at": now - timedelta(hours=i),
+        }
+        for i in range(ROWS)
+    ]
+
+
+def _page(jobs) -> dict:
+    return {"jobs": jobs, "offset": 0, "limit": ROWS, "total": 5000, "has_more": True}
+
+
+def stdlib_miss(rows, objects):
+    page = _page(objects)
+    json.dumps({"data": jsonable_encoder(page)})  # cache copy
+    return json.dumps(jsonable_encoder(page)).encode()  # response
+
+
+def stdlib_hit(raw: str):
+    return json.dumps(jsonable_encoder(json.loads(raw)["data"])).encode()
+
+
+def pydantic_miss(rows, objects):
+    return JobSearchPage.model_validate(_page(rows)).model_dump_json().encode()
+
+
+def orjson_miss(rows, objects):
+    return dumps(_page(rows))
+
+
+def orjson_hit(raw: str):
+    return _unpack(raw)["body"]
+
+
+def _time(fn, arg, n: int) -> float:
+    for _ in range(min(n, 50)):  # warm up
+        fn(*arg)
+    started = time.perf_counter()
+    for _ in range(n):
+        fn(*arg)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=2000, help="iterations per case")
+    args = parser.parse_args()
+
+    rows = _rows()
+    objects = [Job(**row) for row in rows]
+    stdlib_raw = json.dumps({"data": jsonable_encoder(_page(objects))})
+    payload = {
+        "v": ["1"],
+        "delta": 0.01,
+        "exp": time.time(),
+        "body": dumps(_page(rows)),
+    }
+    orjson_raw = _pack(payload).decode()  # as the decoding Redis client returns it
+
+    cases = [
+        ("stdlib miss", stdlib_miss, (rows, objects)),
+        ("stdlib hit", stdlib_hit, (stdlib_raw,)),
+        ("pydantic miss", pydantic_miss, (rows, objects)),
+        ("orjson miss", orjson_miss, (rows, objects)),
+        ("orjson hit (redis)", orjson_hit, (orjson_raw,)),
+    ]
+    print(f"{ROWS}-row page, {len(payload['body'])} bytes encoded")
+    for name, fn, arg in cases:
+        print(f"{name:>20}: {_time(fn, arg, args.n):9.1f} us")
+    print(f"{'orjson hit (local)':>20}: {0:9.1f} us (stored bytes sent as is)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Worker cold start: import time and time until the first request is served.
+
+Every run starts a fresh interpreter, like a worker being scaled up:
+
+* import   ``import app.main``, building the app included
+* serve    from spawning ``uvicorn app.main:app`` until ``/docs`` answers:
+           interpreter, imports, lifespan (Redis and pool warm-up) and the
+           listening socket
+
+``--routers`` mounts only some routers (settings.routers), to see what a
+worker serving part of the API saves. Results can be saved as JSON and
+compared with benchmarks.compare.
+
+    python -m benchmarks.bench_startup --runs 10 --out startup.json
+    python -m benchmarks.bench_startup --routers jobs
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from . import results
+
+IMPORT_APP = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def time_import(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_APP],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.split()[-1])
+
+
+def time_serve(env: dict, port: int, timeout: float = 30) -> float:
+    url = f"http://127.0.0.1:{port}/docs"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        # one client: creating one per poll costs more than the poll interval
+        with httpx.Client() as http:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if http.get(url).status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with status {server.returncode}")
+                time.sleep(0.01)
+        raise RuntimeError(f"server at {url} did not start in {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--routers", nargs="+", help="mount only these routers")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.routers:
+        env["ROUTERS"] = json.dumps(args.routers)
+
+    timings = {"import": [], "serve": []}
+    for run in range(args.runs):
+        timings["import"].append(time_import(env))
+        timings["serve"].append(time_serve(env, args.port))
+        print(
+            f"run {run + 1}: import {timings['import'][-1] * 1000:.0f} ms, "
+            f"first response {timings['serve'][-1] * 1000:.0f} ms"
+        )
+
+    summaries = {
+        phase: results.summarize(values, Counter({200: len(values)}))
+        for phase, values in timings.items()
+    }
+    results.print_table(summaries)
+    if args.out:
+        params = {"runs": args.runs, "routers": args.routers}
+        results.save(args.out, "startup", params, summaries)
+
+
+if __name__ == "__main__":
+    main()
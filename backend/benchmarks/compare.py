@@ -0,0 +1,84 @@
+"""Compare two benchmark result files and flag regressions.
+
+A scenario regresses when its p95 latency grows, or its throughput (load
+tests) drops, by more than ``--threshold`` percent, or when it has server
+errors the baseline did not. Exits with status 1 on any regression so it can
+gate CI.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+
+def _change(before, after) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Print the per-scenario deltas; returns the regressed scenario names."""
+    regressions = []
+    print(
+        f"{'scenario':<24}{'p95 before':>12}{'p95 after':>12}{'change':>9}"
+        f"{'rps before':>12}{'rps after':>12}{'change':>9}"
+    )
+    for name, before in baseline["results"].items():
+        after = current["results"].get(name)
+        if after is None:
+            print(f"{name:<24}  missing from the current run")
+            continue
+
+        p95 = _change(before["p95_ms"], after["p95_ms"])
+        line = f"{name:<24}{before['p95_ms']:>12}{after['p95_ms']:>12}{p95:>8.1f}%"
+        reasons = []
+        if p95 > threshold:
+            reasons.append("p95")
+        if "rps" in before and "rps" in after:
+            rps = _change(before["rps"], after["rps"])
+            line += f"{before['rps']:>12}{after['rps']:>12}{rps:>8.1f}%"
+            if rps < -threshold:
+                reasons.append("rps")
+        if after["errors"] > before["errors"]:
+            reasons.append("errors")
+        if reasons:
+            regressions.append(name)
+            line += f"  REGRESSION ({', '.join(reasons)})"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="allowed change in percent"
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline["kind"] != current["kind"]:
+        sys.exit(
+            f"cannot compare a {baseline['kind']} run with a {current['kind']} run"
+        )
+    for key in ("database", "commit"):
+        print(f"{key}: {baseline['environment'][key]} -> {current['environment'][key]}")
+    if baseline["params"] != current["params"]:
+        print("warning: the runs used different parameters")
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold}%")
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Concurrent load against a seeded database with a weighted request mix.
+
+``--concurrency`` workers each send requests back to back for
+``--duration`` seconds, picking a scenario by its weight (or from
+``--scenario`` only). Reports throughput, latency percentiles and errors per
+route and overall. Served in-process by default; ``--url`` drives a running
+server instead, e.g. several uvicorn workers on local MySQL.
+
+    python -m benchmarks.load_test --concurrency 50 --duration 30 --out load.json
+    python -m benchmarks.load_test --url http://localhost:8000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from . import results
+from .scenarios import SCENARIOS, client, request_args, select_scenarios, tokens
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def add(self, name: str, latency: float, status: int):
+        self.latencies[name].append(latency)
+        self.statuses[name][status] += 1
+
+
+async def worker(http, scenarios, weights, auth, rng, deadline, recorder, cache):
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(scenarios, weights=weights)[0]
+        request = request_args(scenario, rng, auth, cache)
+        started = time.perf_counter()
+        try:
+            response = await http.get(scenario.path, **request)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 599  # connection error or timeout
+        recorder.add(scenario.name, time.perf_counter() - started, status)
+
+
+async def run(args) -> dict:
+    scenarios = select_scenarios(args.scenario)
+    weights = [scenario.weight for scenario in scenarios]
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async def drive(http, auth, seconds: float, recorder: Recorder, seed: int):
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(
+                worker(
+                    http,
+                    scenarios,
+                    weights,
+                    auth,
+                    random.Random(seed + i),
+                    deadline,
+                    recorder,
+                    args.cache,
+                )
+                for i in range(args.concurrency)
+            )
+        )
+
+    recorder = Recorder()
+    async with client(args.url, args.rate_limit, timeout=60, limits=limits) as http:
+        auth = await tokens()
+        if args.warmup:
+            await drive(http, auth, args.warmup, Recorder(), -args.concurrency)
+        started = time.perf_counter()
+        await drive(http, auth, args.duration, recorder, args.seed)
+        elapsed = time.perf_counter() - started
+
+    summaries = {
+        name: results.summarize(
+            recorder.latencies[name], recorder.statuses[name], elapsed
+        )
+        for name in sorted(recorder.latencies)
+    }
+    summaries["overall"] = results.summarize(
+        [latency for values in recorder.latencies.values() for latency in values],
+        sum(recorder.statuses.values(), Counter()),
+        elapsed,
+    )
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        help=f"repeatable; default the weighted mix of "
+        f"{', '.join(s.name for s in SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--cache", action="store_true", help="let repeated requests hit the cache"
+    )
+    parser.add_argument(
+        "--rate-limit", action="store_true", help="keep the rate limiter on"
+    )
+    parser.add_argument("--url", help="drive a running server instead (same database)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    summaries = asyncio.run(run(args))
+    results.print_table(summaries)
+    if args.out:
+        params = {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "scenarios": args.scenario,
+            "cache": args.cache,
+            "rate_limit": args.rate_limit,
+            "url": args.url,
+            "seed": args.seed,
+        }
+        results.save(args.out, "load", params, summaries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Latency summaries and the JSON result files compared by benchmarks.compare."""
+
+import json
+import platform
+import subprocess
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+
+
+def percentile(ordered: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def summarize(latencies: list, statuses: Counter, elapsed: float = None) -> dict:
+    """Latency percentiles in milliseconds, status counts and, given the
+    wall-clock ``elapsed`` seconds, throughput."""
+    ordered = sorted(latencies)
+    n = len(ordered)
+    summary = {
+        "n": n,
+        "errors": sum(count for code, count in statuses.items() if code >= 500),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "mean_ms": round(sum(ordered) / n * 1000, 3) if n else 0.0,
+        "min_ms": round(ordered[0] * 1000, 3) if n else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 3) if n else 0.0,
+    }
+    for p in (50, 95, 99):
+        summary[f"p{p}_ms"] = round(percentile(ordered, p) * 1000, 3)
+    if elapsed:
+        summary["rps"] = round(n / elapsed, 1)
+    return summary
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment() -> dict:
+    """What a result depends on besides the code: interpreter, database and
+    the settings that shape the hot paths."""
+    return {
+        "commit": _git_commit(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "database": make_url(settings.async_database_url).get_backend_name(),
+        "redis": settings.redis_url.split(":", 1)[0],
+        "settings": {
+            "db_pool_size": settings.db_pool_size,
+            "db_max_overflow": settings.db_max_overflow,
+            "rate_limit_enabled": settings.rate_limit_enabled,
+            "cache_local_max_entries": settings.cache_local_max_entries,
+        },
+    }
+
+
+def save(path: str, kind: str, params: dict, results: dict):
+    """Write one run: ``results`` maps a scenario name to its summary."""
+    document = {
+        "kind": kind,
+        "environment": environment(),
+        "params": params,
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(document, indent=2) + "\n")
+    print(f"results written to {path}")
+
+
+def print_table(results: dict):
+    columns = ["n", "rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "errors"]
+    print(f"{'scenario':<24}" + "".join(f"{c:>10}" for c in columns))
+    for name, summary in results.items():
+        print(f"{name:<24}" + "".join(f"{summary.get(c, ''):>10}" for c in columns))
@@ -0,0 +1,203 @@
+"""The requests the endpoint benchmarks and the load driver send.
+
+Each scenario is one route with randomized parameters drawn from the same
+vocabulary as benchmarks.seed, so they hit seeded rows. Unless caching is
+asked for, every request carries a unique ``_nonce`` parameter: it is part
+of the response cache key, so the handler and its queries run every time.
+"""
+
+import random
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import func, select
+
+from app.api.v1.auth import create_access_token
+from app.config import settings
+from app.db.database import async_engine, async_reader_engine, asyncReaderSessionLocal
+from app.models.stats import ClientJobStat
+from app.models.user import User
+
+from .seed import CATEGORIES, LOCATIONS, SKILLS
+
+API = "/app/api/v1"
+
+WORDS = [name for name, _ in SKILLS]
+CATEGORY_NAMES = [name for name, _ in CATEGORIES]
+LOCATION_NAMES = [name for name, _ in LOCATIONS]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    path: str
+    params: Callable[[random.Random], dict]
+    # whose token is sent: "client", "admin" or None
+    role: Optional[str] = None
+    # share of the load test mix
+    weight: int = 1
+
+
+def _search_text(rng):
+    return {"query": f"{rng.choice(WORDS)} {rng.choice(['developer', 'expert'])}"}
+
+
+def _search_filtered(rng):
+    low = rng.choice([50, 100, 250, 500])
+    return {
+        "query": rng.choice(WORDS),
+        "match": "any",
+        "budget_min": low,
+        "budget_max": low * rng.choice([2, 4, 10]),
+        "job_type": rng.choice(["fixed", "hourly"]),
+    }
+
+
+def _search_facets(rng):
+    return {
+        "query": rng.choice(WORDS),
+        "facets": ["category", "job_type", "work_mode", "budget"],
+        "offset": rng.choice([0, 10, 20]),
+    }
+
+
+def _client_dashboard(rng):
+    params = {"page": rng.randint(1, 5), "sort_by": "created_at"}
+    if rng.random() < 0.5:
+        params["status"] = rng.choice(["open", "in_progress", "closed"])
+    if rng.random() < 0.3:
+        params["category"] = rng.choice(CATEGORY_NAMES)
+    return params
+
+
+def _freelancer_search(rng):
+    params = {"skill": ",".join(rng.sample(WORDS[:10], rng.randint(1, 2)))}
+    if rng.random() < 0.3:
+        params["location"] = rng.choice(LOCATION_NAMES)
+    if rng.random() < 0.3:
+        params["max_rate"] = rng.choice([20, 40, 80])
+    return params
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("search_recent", f"{API}/jobs/search", lambda rng: {}, weight=4),
+    Scenario("search_text", f"{API}/jobs/search", _search_text, weight=6),
+    Scenario("search_filtered", f"{API}/jobs/search", _search_filtered, weight=3),
+    Scenario(
+        "search_keyset",
+        f"{API}/jobs/search",
+        lambda rng: {"pagination": "keyset", "totals": "has_more"},
+        weight=2,
+    ),
+    Scenario("search_facets", f"{API}/jobs/search", _search_facets, weight=2),
+    Scenario(
+        "freelancer_search",
+        f"{API}/profiles/freelancers/search",
+        _freelancer_search,
+        role="client",
+        weight=3,
+    ),
+    Scenario(
+        "client_dashboard",
+        f"{API}/ClientDashboard/job/Panel",
+        _client_dashboard,
+        role="client",
+        weight=2,
+    ),
+    Scenario(
+        "admin_dashboard",
+        f"{API}/ClientDashboard/Admin/Dashboard",
+        lambda rng: {},
+        role="admin",
+    ),
+    Scenario(
+        "admin_users",
+        f"{API}/users/admin/user",
+        lambda rng: {"role": rng.choice(["client", "freelance"])},
+        role="admin",
+    ),
+]
+
+BY_NAME: Dict[str, Scenario] = {scenario.name: scenario for scenario in SCENARIOS}
+
+
+def select_scenarios(names: Optional[List[str]]) -> List[Scenario]:
+    if not names:
+        return SCENARIOS
+    unknown = [name for name in names if name not in BY_NAME]
+    if unknown:
+        raise SystemExit(
+            f"unknown scenario(s): {', '.join(unknown)}; "
+            f"choose from {', '.join(BY_NAME)}"
+        )
+    return [BY_NAME[name] for name in names]
+
+
+def _token(user) -> str:
+    return create_access_token(
+        {"email": user.email, "id": str(user.id), "role": user.role}
+    )
+
+
+async def tokens() -> Dict[str, str]:
+    """Bearer tokens of seeded users: the client with the most jobs and the
+    first admin."""
+    async with asyncReaderSessionLocal() as db:
+        client_id = await db.scalar(
+            select(ClientJobStat.user_id)
+            .group_by(ClientJobStat.user_id)
+            .order_by(func.sum(ClientJobStat.job_count).desc())
+            .limit(1)
+        )
+        client = await db.get(User, client_id) if client_id else None
+        admin = await db.scalar(select(User).where(User.role == "admin").limit(1))
+    if client is None or admin is None:
+        raise SystemExit("no seeded client with jobs or admin; run benchmarks.seed")
+    return {"client": _token(client), "admin": _token(admin)}
+
+
+def request_args(
+    scenario: Scenario, rng: random.Random, auth: Dict[str, str], cache: bool
+) -> dict:
+    params = scenario.params(rng)
+    if not cache:
+        params["_nonce"] = uuid.uuid4().hex
+    headers = {}
+    if scenario.role:
+        headers["Authorization"] = f"Bearer {auth[scenario.role]}"
+    return {"params": params, "headers": headers}
+
+
+def load_app(rate_limit: bool = False):
+    """The application, with the rate limiter off unless asked for: it would
+    cap the throughput being measured."""
+    settings.rate_limit_enabled = rate_limit
+    from app.main import app
+
+    return app
+
+
+@asynccontextmanager
+async def client(url: Optional[str] = None, rate_limit: bool = False, **kwargs):
+    """An HTTP client for ``url``, or for the app served in-process (its
+    lifespan runs for the duration)."""
+    try:
+        if url:
+            async with httpx.AsyncClient(base_url=url, **kwargs) as http:
+                yield http
+            return
+
+        app = load_app(rate_limit)
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", **kwargs
+            ) as http:
+                yield http
+    finally:
+        # pooled aiosqlite connections left open keep the process from exiting
+        await async_engine.dispose()
+        await async_reader_engine.dispose()
@@ -0,0 +1,291 @@
+"""Seed the configured database with synthetic users, profiles and jobs.
+
+Volumes and distributions are configurable and the data is reproducible for
+a given ``--seed``, apart from the ids, which are UUIDv7 like the app's. Rows
+are written in batches through the same paths as the app (search index,
+client_job_stats, profile_skills), then the admin rollups are brought up to
+date. Every user's password is ``benchmark-password``.
+
+    # offline: SQLite file and the in-process fake Redis
+    export DATABASE_URL=sqlite:///bench.db
+    export ASYNC_DATABASE_URL=sqlite+aiosqlite:///bench.db
+    export REDIS_URL=fakeredis://
+    python -m benchmarks.seed --reset --users 10000 --jobs 1000000
+
+    # local MySQL (tables from alembic, or --reset to drop and recreate them)
+    python -m benchmarks.seed --users 10000 --jobs 1000000
+"""
+
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import inspect, insert, text
+
+from app.core.hashing import hash_password
+from app.crud.skill import skill_ids
+from app.db.database import Base, engine
+from app.db.init_db import init_db
+from app.db.types import new_id
+from app.models.profile import Profile
+from app.models.skill import profile_skills
+from app.models.user import User
+from app.utils.job_import import insert_jobs
+from app.utils.rollups import run_rollups
+
+PASSWORD = "benchmark-password"
+
+# (value, weight) pairs; the skew is what makes the benchmarks realistic
+SKILLS = [
+    ("python", 30),
+    ("javascript", 28),
+    ("react", 20),
+    ("django", 14),
+    ("fastapi", 10),
+    ("sql", 18),
+    ("node", 12),
+    ("figma", 9),
+    ("seo", 7),
+    ("copywriting", 8),
+    ("docker", 8),
+    ("aws", 9),
+    ("php", 7),
+    ("wordpress", 8),
+    ("flutter", 5),
+    ("swift", 4),
+    ("kotlin", 4),
+    ("excel", 6),
+    ("photoshop", 6),
+    ("translation", 5),
+    ("go", 3),
+    ("rust", 2),
+    ("devops", 5),
+    ("ml", 4),
+]
+CATEGORIES = [
+    ("development", 40),
+    ("design", 15),
+    ("writing", 12),
+    ("marketing", 10),
+    ("data", 8),
+    ("mobile", 7),
+    ("translation", 4),
+    ("support", 4),
+]
+STATUSES = [("open", 55), ("in_progress", 20), ("closed", 25)]
+WORK_MODES = [("remote", 60), ("hybrid", 25), ("on-site", 15)]
+JOB_TYPES = [("fixed", 60), ("hourly", 40)]
+LOCATIONS = [
+    ("tunis", 20),
+    ("sfax", 8),
+    ("paris", 12),
+    ("london", 10),
+    ("berlin", 8),
+    ("new york", 10),
+    ("remote", 25),
+    ("cairo", 7),
+]
+ROLES = ["developer", "designer", "engineer", "consultant", "writer", "expert"]
+ADJECTIVES = ["senior", "junior", "lead", "freelance", "experienced", "part-time"]
+
+
+class Picker:
+    """Weighted choices from a seeded random generator."""
+
+    def __init__(self, rng: random.Random, pairs):
+        self.rng = rng
+        self.values = [value for value, _ in pairs]
+        self.cum_weights = []
+        total = 0
+        for _, weight in pairs:
+            total += weight
+            self.cum_weights.append(total)
+
+    def __call__(self, k: Optional[int] = None):
+        """One value, or a list of ``k`` (with repeats)."""
+        picks = self.rng.choices(self.values, cum_weights=self.cum_weights, k=k or 1)
+        return picks if k else picks[0]
+
+
+def _created_at(rng: random.Random, now: datetime, days: int) -> datetime:
+    # more recent rows are more frequent, like a growing platform
+    age = days * (1 - math.sqrt(rng.random()))
+    return (now - timedelta(days=age)).replace(microsecond=0)
+
+
+def seed_users(args, rng, now) -> dict:
+    """Insert the users; returns their ids by role."""
+    password = hash_password(PASSWORD)
+    ids = {"client": [], "freelance": [], "admin": []}
+    freelancers = int(args.users * args.freelancer_share)
+    roles = ["admin"] * args.admins + ["freelance"] * freelancers
+    roles += ["client"] * (args.users - len(roles))
+    rng.shuffle(roles)
+
+    rows = []
+    for i, role in enumerate(roles):
+        user_id = new_id()
+        ids[role].append(user_id)
+        rows.append(
+            {
+                "id": user_id,
+                "name": f"{role} user {i:07d}",
+                "email": f"{role}{i}@bench.test",
+                "password": password,
+                "role": role,
+                "is_banned": rng.random() < args.banned_share,
+                "created_at": _created_at(rng, now, args.days),
+            }
+        )
+        if len(rows) >= args.batch:
+            _insert(User, rows)
+            rows = []
+    _insert(User, rows)
+    return ids
+
+
+def _insert(model, rows):
+    if rows:
+        with engine.begin() as connection:
+            connection.execute(insert(model), rows)
+
+
+def seed_profiles(args, rng, freelancer_ids: list) -> int:
+    skill = Picker(rng, SKILLS)
+    location = Picker(rng, LOCATIONS)
+    with engine.begin() as connection:
+        names = [name for name, _ in SKILLS]
+        skill_id = dict(zip(names, skill_ids(connection, names)))
+
+    count = 0
+    profiles, links = [], []
+    for user_id in freelancer_ids:
+        if rng.random() >= args.profile_share:
+            continue
+        profile_id = new_id()
+        skills = list(dict.fromkeys(skill(rng.randint(1, 6))))
+        profiles.append(
+            {
+                "id": profile_id,
+                "user_id": user_id,
+                "bio": f"Freelancer working with {', '.join(skills)}.",
+                "skills": ",".join(skills),
+                "experience": f"{rng.randint(0, 20)} years",
+                "hourly_rate": round(rng.lognormvariate(3.2, 0.6), 2),
+                "location": location(),
+                "available": rng.random() < 0.7,
+            }
+        )
+        links += [{"profile_id": profile_id, "skill_id": skill_id[s]} for s in skills]
+        count += 1
+        if len(profiles) >= args.batch:
+            _insert_profiles(profiles, links)
+            profiles, links = [], []
+    _insert_profiles(profiles, links)
+    return count
+
+
+def _insert_profiles(profiles, links):
+    # bulk inserts skip the listener that fills profile_skills, so link here
+    if profiles:
+        with engine.begin() as connection:
+            connection.execute(insert(Profile), profiles)
+            connection.execute(insert(profile_skills), links)
+
+
+def seed_jobs(args, rng, now, client_ids: list) -> int:
+    skill = Picker(rng, SKILLS)
+    category = Picker(rng, CATEGORIES)
+    status = Picker(rng, STATUSES)
+    work_mode = Picker(rng, WORK_MODES)
+    job_type = Picker(rng, JOB_TYPES)
+    location = Picker(rng, LOCATIONS)
+    # a few clients post most of the jobs
+    client_weights = [1 / (rank + 1) for rank in range(len(client_ids))]
+
+    rows = []
+    owners = rng.choices(client_ids, weights=client_weights, k=args.jobs)
+    for i, user_id in enumerate(owners):
+        skills = skill(rng.randint(1, 3))
+        job_status = status()
+        created_at = _created_at(rng, now, args.days)
+        rows.append(
+            {
+                "id": new_id(),
+                "user_id": user_id,
+                "title": f"{rng.choice(ADJECTIVES)} {skills[0]} {rng.choice(ROLES)}",
+                "job_description": (
+                    f"Looking for help with {' and '.join(skills)}. "
+                    f"Job {i} in {category()}; details to be discussed."
+                ),
+                "location": location(),
+                "budget": round(rng.lognormvariate(6, 1), 2),
+                "is_active": job_status != "closed" and rng.random() < 0.95,
+                "job_type": job_type(),
+                "category": category(),
+                "status": job_status,
+                "deadline": created_at + timedelta(days=rng.randint(7, 120)),
+                "estimated_duration": f"{rng.randint(1, 12)} weeks",
+                "work_mode": work_mode(),
+                "visibility": "public",
+                "payment_status": "paid" if job_status == "closed" else "pending",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+        if len(rows) >= args.batch:
+            with engine.begin() as connection:
+                insert_jobs(connection, rows)
+            rows = []
+            print(f"\r  jobs {i + 1}/{args.jobs}", end="", flush=True)
+    if rows:
+        with engine.begin() as connection:
+            insert_jobs(connection, rows)
+    return len(owners)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--freelancer-share", type=float, default=0.6)
+    parser.add_argument(
+        "--profile-share",
+        type=float,
+        default=0.8,
+        help="share of freelancers with a profile",
+    )
+    parser.add_argument("--banned-share", type=float, default=0.01)
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365, help="history spread")
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reset", action="store_true", help="drop and recreate all tables first"
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    if args.reset:
+        Base.metadata.drop_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    if not inspect(engine).get_table_names():
+        init_db()
+
+    started = time.perf_counter()
+    ids = seed_users(args, rng, now)
+    print(f"users: {', '.join(f'{len(v)} {k}' for k, v in ids.items())}")
+    print(f"profiles: {seed_profiles(args, rng, ids['freelance'])}")
+    if ids["client"]:
+        print(f"\rjobs: {seed_jobs(args, rng, now, ids['client'])}          ")
+    print(f"rollups: {run_rollups()}")
+    print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()